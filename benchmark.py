@@ -0,0 +1,369 @@
+import changed_check_style
+import check_commit_style
+import diff_corpus
+import diff_engine
+import diff_util
+import fixtures
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import yaml
+
+
+benchmarks = {}
+
+
+def benchmark(function):
+    """Registers function as benchmark, its name without "benchmark_" prefix is benchmark name."""
+    benchmarks[function.__name__[len("benchmark_"):]] = function
+    return function
+
+
+def measure(function, repeat=3):
+    """Returns best wall-clock time of function calls, in seconds."""
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+@benchmark
+def benchmark_line_translation(hunks=2000):
+    """Translates one line between every two hunks of a diff with many hunks onto the diff,
+    once with line translation index built per lookup and once with index built once."""
+
+    # every hunk is 3 context lines, 1 removed, 1 added and 3 context lines, hunks are 20 lines apart
+    map_data = {}
+    diff_line = 2
+    for hunk in range(hunks):
+        diff_line += 1
+        start = hunk * 20
+        for line in range(start, start + 7):
+            if line == start + 3:
+                diff_line += 1
+            map_data[line] = diff_line
+            diff_line += 1
+
+    lookups = [ hunk * 20 + 10 for hunk in range(hunks) ]
+    translate = changed_check_style.translate_line_numbers_onto_diff_for_github
+
+    def unindexed():
+        for line in lookups:
+            translate(line, map_data, True)
+
+    def indexed():
+        index = changed_check_style.line_translation_index(map_data)
+        for line in lookups:
+            translate(line, map_data, True, index)
+
+    return {"hunks": hunks, "lookups": len(lookups),
+            "unindexed_seconds": measure(unindexed, repeat=1), "indexed_seconds": measure(indexed)}
+
+
+def allocated_bytes(function):
+    """Returns number of bytes still allocated by Python after calling function and keeping its result."""
+
+    tracemalloc.start()
+    try:
+        result = function()
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+@benchmark
+def benchmark_scaling(lines=10000, factor=4, change_every=50):
+    """Parses the unidiff of a file of lines lines and of a factor times bigger one with changed,
+    translates the same lines onto both, index building included. Reports how many times more time
+    the bigger one takes, linear parsing and translation take about factor times more
+    (peak memory ratio is checked by test_diff_corpus)."""
+
+    small, big = diff_corpus.scaled_diff(lines, change_every), diff_corpus.scaled_diff(lines * factor, change_every)
+    small_out, big_out = diff_util.changed(small)["out"], diff_util.changed(big)["out"]
+    lookups = range(0, lines * factor, 7)
+
+    def translate(out):
+        index = changed_check_style.line_translation_index(out)
+        for line in lookups:
+            changed_check_style.translate_line_numbers_onto_diff_for_github(line, out, True, index)
+
+    return {"lines": lines, "factor": factor,
+            "changed_time_ratio": measure(lambda: diff_util.changed(big)) / measure(lambda: diff_util.changed(small)),
+            "translation_time_ratio": measure(lambda: translate(big_out)) / measure(lambda: translate(small_out))}
+
+
+@benchmark
+def benchmark_diff_engine(lines=100000, changed_lines=1000, seed=0):
+    """Diffs a big file with its styled version that changes changed_lines lines, with difflib unidiff
+    parsed back by changed, and with diff_engine algorithms returning blocks directly.
+    Also diffs the file with its re-indented version, where every line is changed."""
+
+    generator = random.Random(seed)
+    original = [ synthetic_source_line(line) for line in range(lines) ]
+    styled = list(original)
+    for line in generator.sample(range(lines), changed_lines):
+        styled[line] = styled[line].replace(" = ", "=")
+
+    reindented = [ "  " + line for line in original ]
+
+    result = {"lines": lines, "changed_lines": changed_lines,
+              "difflib_changed_seconds": measure(lambda: diff_util.changed(diff_util.diff_lines(original, styled)), repeat=1),
+              "identical_seconds": measure(lambda: diff_engine.diff_blocks(original, list(original)))}
+    for algorithm in diff_engine.ALGORITHMS:
+        result[algorithm + "_seconds"] = measure(lambda: diff_engine.diff_blocks(original, styled, algorithm), repeat=1)
+        result[algorithm + "_linear_space_seconds"] = measure(lambda: diff_engine.diff_blocks(original, styled, algorithm, True), repeat=1)
+        result[algorithm + "_reindented_seconds"] = measure(lambda: diff_engine.diff_blocks(original, reindented, algorithm), repeat=1)
+    return result
+
+
+@benchmark
+def benchmark_corpus(max_lines=100000, change_rate=0.01, seed=0):
+    """Parses unidiffs of random file pairs of 1000, 10000, ... up to max_lines lines with changed,
+    translates every line onto the diff, checks results against the reference
+    implementation. Reports time per 1000 diff lines for every size, it stays flat while parsing is linear."""
+
+    generator = random.Random(seed)
+    result = {"change_rate": change_rate, "sizes": []}
+    lines = 1000
+    while lines <= max_lines:
+        a = diff_corpus.random_source(generator, lines)
+        b = diff_corpus.mutate(generator, a, change_rate)
+        diff = diff_corpus.unidiff(a, b)
+        out = diff_util.changed(diff)["out"]
+
+        def translate():
+            index = changed_check_style.line_translation_index(out)
+            for line in range(len(b)):
+                changed_check_style.translate_line_numbers_onto_diff_for_github(line, out, True, index)
+
+        thousands = len(diff) / 1000
+        result["sizes"].append({"lines": lines, "diff_lines": len(diff),
+                                "matches_reference": diff_util.changed(diff) == diff_corpus.reference_changed(a, b),
+                                "changed_seconds_per_1000": measure(lambda: diff_util.changed(diff)) / thousands,
+                                "changed_bytes_per_line": allocated_bytes(lambda: diff_util.changed(diff)) / len(diff),
+                                "changed_compact_seconds_per_1000": measure(lambda: diff_util.changed_compact(diff)) / thousands,
+                                "changed_compact_bytes_per_line": allocated_bytes(lambda: diff_util.changed_compact(diff)) / len(diff),
+                                "translation_seconds_per_1000": measure(translate) / len(b) * 1000 if b and out else None})
+        lines *= 10
+    return result
+
+
+def synthetic_git_diff(files=50, hunks=200, hunk_context=3, changed_lines=2):
+    """Returns lines of synthetic "git diff" output with files * hunks hunks."""
+
+    git_diff = []
+    for file in range(files):
+        name = "src/file{}.cpp".format(file)
+        git_diff += ["diff --git a/{0} b/{0}".format(name), "index 1b906cf..3a26bdb 100644",
+                     "--- a/{}".format(name), "+++ b/{}".format(name)]
+        for hunk in range(hunks):
+            start = hunk * 50 + 1
+            length = 2 * hunk_context + changed_lines
+            git_diff.append("@@ -{0},{1} +{0},{1} @@ int function{2}()".format(start, length, hunk))
+            git_diff += ["     int context{} = {};".format(line, hunk) for line in range(hunk_context)]
+            git_diff += ["-    int changed{} = {};".format(line, hunk) for line in range(changed_lines)]
+            git_diff += ["+    int  changed{} = {};".format(line, hunk) for line in range(changed_lines)]
+            git_diff += ["     int context{} = {};".format(line, hunk) for line in range(hunk_context)]
+    return git_diff
+
+
+@benchmark
+def benchmark_parsing(files=50, hunks=200):
+    """Parses multi-megabyte synthetic git diff with parse_git_diff, then every file's diff with changed."""
+
+    git_diff = synthetic_git_diff(files, hunks)
+    parsed = diff_util.parse_git_diff(git_diff)
+    megabytes = sum(len(line) + 1 for line in git_diff) / 1024 / 1024
+
+    parse_git_diff_seconds = measure(lambda: diff_util.parse_git_diff(git_diff))
+    changed_seconds = measure(lambda: [ diff_util.changed(parsed[file]["unidiff"]) for file in parsed ])
+    hunk_headers = [ line for line in git_diff if line.startswith("@@") ]
+    hunk_header_seconds = measure(lambda: [ diff_util.parse_hunk_header(line) for line in hunk_headers ])
+
+    return {"megabytes": megabytes, "lines": len(git_diff), "hunks": len(hunk_headers),
+            "parse_git_diff_seconds": parse_git_diff_seconds,
+            "parse_git_diff_megabytes_per_second": megabytes / parse_git_diff_seconds,
+            "changed_seconds": changed_seconds,
+            "changed_megabytes_per_second": megabytes / changed_seconds,
+            "parse_hunk_header_seconds": hunk_header_seconds}
+
+
+# fake styler: collapses runs of spaces that are not indentation
+FAKE_STYLER_COMMAND = ["sed", "-e", "s/\\([^ ]\\)  */\\1 /g"]
+
+
+def synthetic_source_line(number, bad_style=False):
+    return "    int {}value{} = {};".format(" " if bad_style else "", number, number)
+
+
+def create_synthetic_repository(directory, files=20, lines=2000, hunk_density=0.01, error_rate=0.5,
+                                styler_command=FAKE_STYLER_COMMAND, seed=0):
+    """Creates git repository in directory with two commits: the first adds files of lines lines each,
+    the second changes hunk_density of all lines, error_rate of changed lines get bad formatting.
+    Style configuration uses styler_command for .cpp files, the fake styler by default."""
+
+    generator = random.Random(seed)
+    repository = fixtures.Repository(directory)
+    paths = [ "file{}.cpp".format(file) for file in range(files) ]
+
+    base = { path: "".join(synthetic_source_line(line) + "\n" for line in range(lines)) for path in paths }
+    base["style_config.yaml"] = yaml.dump({"style_config": {"c-like": {"suffixes": [".cpp"], "styler_command": styler_command}}})
+    repository.commit("base", base)
+
+    changed = {}
+    for path in paths:
+        source = [ synthetic_source_line(line) for line in range(lines) ]
+        for line in generator.sample(range(lines), max(1, int(lines * hunk_density))):
+            source[line] = synthetic_source_line(line + lines, generator.random() < error_rate)
+        changed[path] = "".join(line + "\n" for line in source)
+    repository.commit("change", changed)
+
+
+@benchmark
+def benchmark_pipeline(files=20, lines=2000, hunk_density=0.01, error_rate=0.5, jobs=1, fake_styler=1):
+    """Times stages of the style check on a synthetic repository: parse_git_diff, changed,
+    style_suggestions and style_suggestions_batch (with styler output and style diffs prepared in advance) and end-to-end main.
+    fake_styler=0 uses the styler from style_config.yaml of the current directory instead of the fake one."""
+
+    styler_command = FAKE_STYLER_COMMAND
+    if not fake_styler:
+        check_commit_style.load_configuration()
+        styler_command = next(iter(check_commit_style.configuration.values()))["styler_command"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        create_synthetic_repository(directory, files, lines, hunk_density, error_rate, styler_command)
+        previous_directory = os.getcwd()
+        os.chdir(directory)
+        try:
+            git_diff = diff_util.split_output(diff_util.run(["git", "diff", "HEAD~1"]))
+            parsed = diff_util.parse_git_diff(git_diff)
+
+            style_diffs = {}
+            for file in parsed:
+                with open(file) as source_file:
+                    original = diff_util.split_output(source_file.read())
+                styled = diff_util.split_output(diff_util.run(styler_command + [file]))
+                style_diffs[file] = diff_util.diff_lines(original, styled, file, "-")
+
+            def end_to_end():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    try:
+                        check_commit_style.main(None, jobs)
+                    except SystemExit:
+                        pass
+
+            return {"files": files, "lines": lines, "hunk_density": hunk_density, "error_rate": error_rate,
+                    "jobs": jobs, "fake_styler": bool(fake_styler), "diff_lines": len(git_diff),
+                    "parse_git_diff_seconds": measure(lambda: diff_util.parse_git_diff(git_diff)),
+                    "changed_seconds": measure(lambda: [ diff_util.changed(parsed[file]["unidiff"]) for file in parsed ]),
+                    "style_suggestions_seconds": measure(lambda: [ changed_check_style.style_suggestions(parsed[file]["unidiff"], style_diffs[file], True)
+                                                                   for file in parsed ]),
+                    "style_suggestions_batch_seconds": measure(lambda: changed_check_style.style_suggestions_batch(
+                        [ (file, parsed[file]["unidiff"], style_diffs[file]) for file in parsed ], True)),
+                    "main_seconds": measure(end_to_end)}
+        finally:
+            os.chdir(previous_directory)
+
+
+# cold start of a style check, from interpreter start to loaded configuration, must stay within this budget
+STARTUP_BUDGET_SECONDS = 0.15
+
+
+@benchmark
+def benchmark_startup(repeat=10):
+    """Times cold start of a fresh interpreter importing check_commit_style and loading style_config.yaml
+    of this repository, with the parsed configuration cache cold and warm. Reports modules imported
+    and whether the warm start is within STARTUP_BUDGET_SECONDS."""
+
+    script = ("import sys, check_commit_style; check_commit_style.load_configuration(); "
+              "print(len(sys.modules), 'yaml' in sys.modules)")
+    module_directory = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ, PYTHONPATH=module_directory)
+
+    def start(cache_directory):
+        environment["STYLE_POLICE_CACHE_DIR"] = cache_directory
+        return subprocess.run([sys.executable, "-c", script], env=environment, cwd=module_directory, check=True,
+                              capture_output=True).stdout.split()
+
+    with tempfile.TemporaryDirectory() as cache_directory:
+        cold_seconds = measure(lambda: start(tempfile.mkdtemp(dir=cache_directory)), repeat)
+        start(cache_directory)
+        warm_seconds = measure(lambda: start(cache_directory), repeat)
+        modules, yaml_imported = start(cache_directory)
+
+    return {"cold_cache_seconds": cold_seconds, "warm_cache_seconds": warm_seconds, "modules": int(modules),
+            "yaml_imported": yaml_imported == b"True", "budget_seconds": STARTUP_BUDGET_SECONDS,
+            "within_budget": warm_seconds <= STARTUP_BUDGET_SECONDS}
+
+
+def parse_parameter(text):
+    """Parses "name=value" benchmark parameter, value is int, float or string."""
+
+    if "=" not in text:
+        raise argparse.ArgumentTypeError("expected name=value: {}".format(text))
+    name, value = text.split("=", 1)
+    for value_type in (int, float):
+        try:
+            return name, value_type(value)
+        except ValueError:
+            pass
+    return name, value
+
+
+def environment():
+    """Returns description of the environment benchmarks run in, to compare results over time."""
+
+    try:
+        revision = diff_util.run(["git", "-C", os.path.dirname(os.path.abspath(__file__)), "rev-parse", "HEAD"]).strip()
+    except (OSError, RuntimeError):
+        revision = None
+
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "revision": revision,
+            "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs style check benchmarks, prints one JSON object per benchmark.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, all by default: {}".format(", ".join(benchmarks)))
+    parser.add_argument("--set", "-s", type=parse_parameter, action="append", default=[], metavar="NAME=VALUE",
+                        help="benchmark parameter, passed to every benchmark that has it, e.g. -s files=100")
+    parser.add_argument("--output", "-o", default=None, help="also append results to this JSON lines file")
+    args = parser.parse_args()
+
+    names = args.names or list(benchmarks)
+    for name in names:
+        if name not in benchmarks:
+            parser.error("unknown benchmark: {}".format(name))
+
+    parameters = dict(args.set)
+    run_environment = environment()
+
+    for name in names:
+        accepted = inspect.signature(benchmarks[name]).parameters
+        result = {"benchmark": name}
+        result.update(benchmarks[name](**{ key: value for key, value in parameters.items() if key in accepted }))
+        result["environment"] = run_environment
+        print(json.dumps(result))
+        sys.stdout.flush()
+
+        if args.output is not None:
+            with open(args.output, "a") as output_file:
+                output_file.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,23 @@
 #import sys
+import array
+import bisect
 import diff_util
-import unittest
+
+
+GITHUB_LINE_NUMBERS_OFFSET = -2
+
+
+def next_smaller_larger_sorted(value, sorted_values):
+    """The same as get_next_smaller_larger, but sorted_values must be a sorted list.
+    Takes O(log N) time."""
+
+    left = bisect.bisect_left(sorted_values, value)
+    right = bisect.bisect_right(sorted_values, value, left)
+
+    smaller = sorted_values[left-1] if left > 0 else None
+    larger = sorted_values[right] if right < len(sorted_values) else None
+
+    return (smaller, larger)
 
 
 def get_next_smaller_larger(value, iterable):
@@ -11,35 +28,30 @@ def get_next_smaller_larger(value, iterable):
     If value is 101, then result will be (100, None).
     If value is -1, then result will be (None, 1)."""
 
-    if not iterable:
-        return (None, None)
+    return next_smaller_larger_sorted(value, sorted(set(iterable)))
 
-    data = set(iterable)
-    data.add(value)
-    sorted_data = list(sorted(data))
-    position = sorted_data.index(value)
-    
-    if position == 0:
-        return (None, sorted_data[1])
 
-    if position == len(sorted_data)-1:
-        return (sorted_data[-2], None)
+def line_translation_index(map_data):
+    """Returns index of map_data ("in" or "out" of diff_util.changed result) for
+    translate_line_numbers_onto_diff_for_github: sorted list of its line numbers.
+    Build it once per diff and reuse for every lookup."""
 
-    return (sorted_data[position-1], sorted_data[position+1])
+    return sorted(map_data)
 
 
-def translate_line_numbers_onto_diff_for_github(line_number, map_data, do_translation):
+def translate_line_numbers_onto_diff_for_github(line_number, map_data, do_translation, index=None):
     assert(map_data)
 
     if not do_translation:
         return line_number
 
-    GITHUB_LINE_NUMBERS_OFFSET = -2
-
     if line_number in map_data:
         return map_data[line_number] + GITHUB_LINE_NUMBERS_OFFSET
 
-    smaller, larger = get_next_smaller_larger(line_number, map_data.keys())
+    if index is None:
+        index = line_translation_index(map_data)
+
+    smaller, larger = next_smaller_larger_sorted(line_number, index)
 
     if larger is not None:
         return map_data[larger] + GITHUB_LINE_NUMBERS_OFFSET
@@ -50,6 +62,78 @@ def translate_line_numbers_onto_diff_for_github(line_number, map_data, do_transl
     return 1
 
 
+def changed_intervals(changes, side):
+    """Returns changed line intervals of "in" or "out" side of diff blocks (diff_util.CompactChanged),
+    as three arrays: interval starts, one-past-last lines, indices of blocks.
+    Blocks that don't change lines on that side are left out. Intervals are sorted, as blocks are."""
+
+    starts, ends, indices = array.array("i"), array.array("i"), array.array("i")
+    block_starts, block_lens = getattr(changes, side + "_starts"), getattr(changes, side + "_lens")
+    for index in range(len(block_starts)):
+        if block_lens[index]:
+            starts.append(block_starts[index])
+            ends.append(block_starts[index] + block_lens[index])
+            indices.append(index)
+    return starts, ends, indices
+
+
+def overlapping_intervals(a_intervals, b_intervals):
+    """Returns indices (third array of changed_intervals) of b intervals that overlap any of a intervals.
+    Both are sorted and non-overlapping within themselves, so they are merged in one sweep."""
+
+    a_starts, a_ends, _ = a_intervals
+    b_starts, b_ends, b_indices = b_intervals
+
+    overlapping = []
+    i, j = 0, 0
+    while i < len(a_starts) and j < len(b_starts):
+        if a_ends[i] <= b_starts[j]:
+            i += 1
+        elif b_ends[j] <= a_starts[i]:
+            j += 1
+        else:
+            overlapping.append(b_indices[j])
+            j += 1
+    return overlapping
+
+
+def style_suggestions_batch(files, use_github_diff_line_number=False):
+    """The same as style_suggestions, but for many files at once.
+    Accepts iterable of (file, a_b_diff, b_style_diff), b_style_diff may also be already computed
+    diff_util.CompactChanged (e.g. from diff_engine.changed_lines) or diff_util.changed result,
+    then it isn't parsed from unidiff. Diffs are parsed with diff_util.changed_compact.
+    Returns flat suggestion table: list of (file, line, styled_start, styled_end) tuples,
+    in the order of files and then of lines."""
+
+    table = []
+    for file, a_b_diff, b_style_diff in files:
+        if isinstance(b_style_diff, diff_util.CompactChanged):
+            style_changes = b_style_diff
+        elif type(b_style_diff) is dict:
+            style_changes = diff_util.CompactChanged(b_style_diff["blocks"])
+        else:
+            style_changes = diff_util.changed_compact(b_style_diff)
+        if not style_changes:
+            continue
+
+        changes = diff_util.changed_compact(a_b_diff)
+
+        style_changed_blocks = overlapping_intervals(changed_intervals(changes, "out"), changed_intervals(style_changes, "in"))
+
+        suggestions = {}
+        for block in style_changed_blocks:
+            line = style_changes.in_starts[block]
+            if use_github_diff_line_number:
+                diff_line = changes.out_diff_line(line)
+                line = diff_line + GITHUB_LINE_NUMBERS_OFFSET if diff_line is not None else 1
+            out_start = style_changes.out_starts[block]
+            suggestions[line] = (out_start, out_start + style_changes.out_lens[block])
+
+        table.extend((file, line) + suggestions[line] for line in sorted(suggestions))
+
+    return table
+
+
 def style_suggestions(a_b_diff, b_style_diff, use_github_diff_line_number=False):
     """Compares two diff a to b diff and b to style diff.
     Returns dict with line numbers as keys, and values are tuples with indeces:
@@ -61,70 +145,5 @@ def style_suggestions(a_b_diff, b_style_diff, use_github_diff_line_number=False)
     If use_github_diff_line_number is True, then instead of plain line number, they are 
     mapped onto diff, to be used in github comments."""
 
-    changes_diff_data = diff_util.changed(a_b_diff)
-    style_diff_data = diff_util.changed(b_style_diff)
-
-    changes_changed_lines = set(changes_diff_data["changed_out"].keys())
-    style_changed_lines = set(style_diff_data["changed_in"].keys())
-    both_changed_lines = changes_changed_lines.intersection(style_changed_lines)
-    style_changed_blocks = { style_diff_data["changed_in"][i] for i in both_changed_lines }
-
-    suggestions = { translate_line_numbers_onto_diff_for_github(style_diff_data["blocks"][block]["in_start"], changes_diff_data["out"], use_github_diff_line_number)
-                    : ( style_diff_data["blocks"][block]["out_start"], style_diff_data["blocks"][block]["out_start"] + style_diff_data["blocks"][block]["out_len"])
-                          for block in style_changed_blocks }
-
-    return suggestions
-
-
-class TestChangedCheckStyle(unittest.TestCase):
-    def test_get_next_smaller_larger(self):
-        self.assertEqual(get_next_smaller_larger(10, []), (None, None))
-        self.assertEqual(get_next_smaller_larger(10, [1, 2, 10, 12, 20, 55, 100]), (2, 12))
-        self.assertEqual(get_next_smaller_larger(11, [1, 2, 10, 12, 20, 55, 100]), (10, 12))
-        self.assertEqual(get_next_smaller_larger(15, [1, 2, 10, 12, 20, 55, 100]), (12, 20))
-        self.assertEqual(get_next_smaller_larger(101, [1, 2, 10, 12, 20, 55, 100]), (100, None))
-        self.assertEqual(get_next_smaller_larger(-11, [1, 2, 10, 12, 20, 55, 100]), (None, 1))
-
-    def test_one(self):
-        a_b_diff = ['--- wrongfully_formatted-a.cpp\t2022-12-15 20:02:47.780977200 +0200', '+++ wrongfully_formatted-b.cpp\t2022-12-15 20:03:35.891497500 +0200', '@@ -8,5 +8,5 @@', ' ', ' int main()', ' {', '-    return 0;', '+    return 1;', ' }']
-        b_style_diff = ['--- wrongfully_formatted-b.cpp\t2022-12-15 20:03:35.891497500 +0200', '+++ -\t2022-12-21 13:18:48.962248900 +0200', '@@ -1,12 +1,8 @@', ' #include <iostream>', ' ', '-class A', '-{', '+class A {', ' public:', '-    A(){}', '+  A() {}', ' };', ' ', '-int main()', '-{', '-    return 1;', '-}', '+int main() { return 1; }']
-        expected = {8: (7, 8)}
-        actual = style_suggestions(a_b_diff, b_style_diff)
-        self.assertEqual(actual, expected)
-
-
-    def test_one_with_line_number_translation(self):
-        a_b_diff = ['--- wrongfully_formatted-a.cpp\t2022-12-15 20:02:47.780977200 +0200', 
-                    '+++ wrongfully_formatted-b.cpp\t2022-12-15 20:03:35.891497500 +0200', 
-                    '@@ -8,5 +8,5 @@', 
-                    ' ', 
-                    ' int main()', 
-                    ' {', 
-                    '-    return 0;', 
-                    '+    return 1;', 
-                    ' }']
-        b_style_diff = ['--- wrongfully_formatted-b.cpp\t2022-12-15 20:03:35.891497500 +0200', 
-                        '+++ -\t2022-12-21 13:18:48.962248900 +0200', 
-                        '@@ -1,12 +1,8 @@', 
-                        ' #include <iostream>', 
-                        ' ', 
-                        '-class A', 
-                        '-{', 
-                        '+class A {', 
-                        ' public:', 
-                        '-    A(){}', 
-                        '+  A() {}', 
-                        ' };', 
-                        ' ', 
-                        '-int main()', 
-                        '-{', 
-                        '-    return 1;', 
-                        '-}', 
-                        '+int main() { return 1; }']
-        expected = {2: (7, 8)}
-        actual = style_suggestions(a_b_diff, b_style_diff, True)
-        self.assertEqual(actual, expected)
-
-
-if __name__ == "__main__":
-    unittest.main()
+    return { line: (start, end) for _, line, start, end in
+             style_suggestions_batch([(None, a_b_diff, b_style_diff)], use_github_diff_line_number) }
@@ -0,0 +1,119 @@
+import check_commit_style
+import instrumentation
+import argparse
+import contextlib
+import io
+import json
+import os
+import socketserver
+import sys
+import time
+
+
+class BatchChecker:
+    """Checks style of many repositories or commits in one process. Jobs are dicts with
+    "repository" (path of a git repository), optional "base" and "head" (see check_commit_style.check_commit
+    base and revision) and optional "id" returned with the result. Configuration of every repository is
+    loaded through the parsed configuration cache, styler backends (e.g. worker pools) are shared
+    between jobs with the same style classes, styler output cache is shared by all jobs.
+    Jobs are run one at a time, each of them checks up to jobs files concurrently."""
+
+    def __init__(self, jobs=None, cache_dir=None):
+        self.jobs = jobs
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else None
+        self.backends = {}
+
+    def check(self, job):
+        """Runs job, returns result dict: "id", "repository", "comments" and "seconds",
+        or "error" instead of "comments" if the job failed."""
+
+        start = time.perf_counter()
+        result = {"id": None, "repository": None}
+        previous_directory = os.getcwd()
+        try:
+            if not isinstance(job, dict):
+                raise ValueError("Job is not a JSON object: {}".format(json.dumps(job)))
+            result.update(id=job.get("id"), repository=job.get("repository"))
+            os.chdir(job["repository"])
+            instrumentation.reset()
+            # check_commit prints suggestions, results go to stdout, so they are kept apart
+            with contextlib.redirect_stdout(sys.stderr):
+                result["comments"] = check_commit_style.check_commit(None, self.jobs, cache_dir=self.cache_dir, base=job.get("base"),
+                                                                     revision=job.get("head"), backends=self.backends)
+        except Exception as error:
+            result["error"] = "{}: {}".format(type(error).__name__, error)
+        finally:
+            os.chdir(previous_directory)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def run(self, lines, output):
+        """Runs jobs from JSON lines, writes a JSON line result for every job to output as soon as it's done."""
+
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as error:
+                result = {"error": "Malformed job: {}".format(error)}
+            else:
+                result = self.check(job)
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    def close(self):
+        for backend in self.backends.values():
+            backend.close()
+        self.backends.clear()
+
+
+def job_server(socket_path, checker):
+    """Returns Unix socket server, every connection to it sends JSON lines jobs and gets JSON lines results
+    back the same way as BatchChecker.run. Connections are served one at a time."""
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            checker.run(io.TextIOWrapper(self.rfile), io.TextIOWrapper(self.wfile, write_through=True))
+
+    return socketserver.UnixStreamServer(socket_path, JobHandler)
+
+
+def serve(socket_path, checker):
+    """Serves jobs on a Unix socket (see job_server) until interrupted."""
+
+    with job_server(socket_path, checker) as server:
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks style of many repositories or commits in one process. "
+                                                 "Jobs are JSON lines: {\"repository\": path, \"base\": ref, \"head\": revision, "
+                                                 "\"id\": any}, results are printed as JSON lines.")
+    parser.add_argument("jobs_file", nargs="?", default="-", help="JSON lines file with jobs, \"-\" for stdin (default)")
+    parser.add_argument("--socket", default=None, help="serve jobs from connections to this Unix socket instead")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="number of files checked concurrently")
+    parser.add_argument("--cache-dir", default=None, help="directory of persistent styler output cache shared by all jobs")
+    args = parser.parse_args()
+
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    checker = BatchChecker(args.jobs, args.cache_dir)
+    try:
+        if args.socket is not None:
+            serve(args.socket, checker)
+        elif args.jobs_file == "-":
+            checker.run(sys.stdin, sys.stdout)
+        else:
+            with open(args.jobs_file) as jobs_file:
+                checker.run(jobs_file, sys.stdout)
+    finally:
+        checker.close()
+
+
+if __name__ == "__main__":
+    main()
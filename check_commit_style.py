@@ -1,7 +1,17 @@
 import diff_util
+import diff_engine
 import changed_check_style
-import sys
-import yaml
+import file_guard
+import instrumentation
+import style_cache
+import style_dispatch
+import styler_backends
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import tempfile
 
 
 configuration = {'c-like': 
@@ -9,11 +19,58 @@ configuration = {'c-like':
                      'styler_command': ['clang-format']}
                 }
 
+dispatcher = style_dispatch.StyleDispatcher(configuration)
+
+DEFAULT_SETTINGS = {"jobs": os.cpu_count() or 1, "cache_dir": None, "cache_max_size": 256 * 1024 * 1024, "ledger": None,
+                    "guard": file_guard.DEFAULT_THRESHOLDS}
+
+settings = dict(DEFAULT_SETTINGS)
+
+# parsed configuration cache (see read_configuration) is in the user cache directory unless STYLE_POLICE_CACHE_DIR is set,
+# e.g. in the Docker action the home directory (/github/home) doesn't outlive the job, so without it the cache is always cold there
+config_cache_dir = os.path.abspath(os.environ.get("STYLE_POLICE_CACHE_DIR") or
+                                   os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "style_police"))
+
+
+def read_configuration(path="style_config.yaml"):
+    """Returns parsed configuration file. Parsed configuration is cached as JSON by hash of the file content,
+    so when the cache has it, neither yaml is imported nor the file is parsed as YAML.
+    Configuration that doesn't survive JSON round-trip unchanged is never cached."""
+
+    with open(path, "rb") as config_file:
+        text = config_file.read()
+
+    cache_path = os.path.join(config_cache_dir, hashlib.sha256(text).hexdigest() + ".json")
+    try:
+        with open(cache_path) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        pass
+
+    import yaml
+    yaml_object = yaml.load(text, yaml.Loader)
+
+    try:
+        cached = json.dumps(yaml_object)
+        if json.loads(cached) == yaml_object:
+            os.makedirs(config_cache_dir, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=config_cache_dir, prefix=".config-")
+            with os.fdopen(file_descriptor, "w") as cache_file:
+                cache_file.write(cached)
+            os.replace(temporary_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+    return yaml_object
+
 
 def load_configuration():
-    with open("style_config.yaml") as config_file:
-        yaml_object = yaml.load(config_file, yaml.Loader)
+    yaml_object = read_configuration()
+    settings.update(DEFAULT_SETTINGS)
     
+    if type(yaml_object) is not dict:
+        raise RuntimeError("Style configuration error.")
+
     if "style_config" not in yaml_object or type(yaml_object["style_config"]) is not dict:
         raise RuntimeError("Style configuration error.")
 
@@ -23,63 +80,466 @@ def load_configuration():
         if "suffixes" not in style_config[style_class] or type(style_config[style_class]["suffixes"]) is not list:
             raise RuntimeError("Style configuration error.")
 
-        if "styler_command" not in style_config[style_class] or type(style_config[style_class]["styler_command"]) is not list:
+        backend = style_config[style_class].get("backend", "subprocess")
+        if backend not in styler_backends.BACKENDS:
+            raise RuntimeError("Style configuration error.")
+
+        if backend == "subprocess":
+            if "styler_command" not in style_config[style_class] or type(style_config[style_class]["styler_command"]) is not list:
+                raise RuntimeError("Style configuration error.")
+        else:
+            if "python_styler" not in style_config[style_class] or type(style_config[style_class]["python_styler"]) is not str:
+                raise RuntimeError("Style configuration error.")
+            if "range_argument" in style_config[style_class]:
+                raise RuntimeError("Style configuration error.")
+
+        for argument in ("range_argument", "stdin_argument"):
+            if argument in style_config[style_class] and type(style_config[style_class][argument]) is not str:
+                raise RuntimeError("Style configuration error.")
+
+        for limit in styler_backends.LIMITS + ("max_file_size",):
+            if limit in style_config[style_class]:
+                if type(style_config[style_class][limit]) not in (int, float) or style_config[style_class][limit] <= 0:
+                    raise RuntimeError("Style configuration error.")
+                if limit != "max_file_size" and backend != "subprocess":
+                    raise RuntimeError("Style configuration error.")
+
+        if "diff_algorithm" in style_config[style_class] and style_config[style_class]["diff_algorithm"] not in diff_engine.ALGORITHMS:
+            raise RuntimeError("Style configuration error.")
+        if "diff_linear_space" in style_config[style_class] and type(style_config[style_class]["diff_linear_space"]) is not bool:
+            raise RuntimeError("Style configuration error.")
+
+        for patterns in ("globs", "exclude"):
+            if patterns in style_config[style_class] and type(style_config[style_class][patterns]) is not list:
+                raise RuntimeError("Style configuration error.")
+
+    if "exclude" in yaml_object and type(yaml_object["exclude"]) is not list:
+        raise RuntimeError("Style configuration error.")
+
+    if "jobs" in yaml_object:
+        if type(yaml_object["jobs"]) is not int or yaml_object["jobs"] < 1:
+            raise RuntimeError("Style configuration error.")
+        settings["jobs"] = yaml_object["jobs"]
+
+    if "cache_dir" in yaml_object:
+        if type(yaml_object["cache_dir"]) is not str:
+            raise RuntimeError("Style configuration error.")
+        settings["cache_dir"] = yaml_object["cache_dir"]
+
+    if "cache_max_size" in yaml_object:
+        if type(yaml_object["cache_max_size"]) is not int or yaml_object["cache_max_size"] < 0:
+            raise RuntimeError("Style configuration error.")
+        settings["cache_max_size"] = yaml_object["cache_max_size"]
+
+    if "ledger" in yaml_object:
+        if type(yaml_object["ledger"]) is not str:
             raise RuntimeError("Style configuration error.")
+        settings["ledger"] = yaml_object["ledger"]
 
-    global configuration
+    if "guard" in yaml_object:
+        if type(yaml_object["guard"]) is not dict:
+            raise RuntimeError("Style configuration error.")
+        for name in yaml_object["guard"]:
+            if name not in file_guard.DEFAULT_THRESHOLDS:
+                raise RuntimeError("Style configuration error.")
+            if name == "generated_markers":
+                if type(yaml_object["guard"][name]) is not list or any(type(marker) is not str for marker in yaml_object["guard"][name]):
+                    raise RuntimeError("Style configuration error.")
+            elif type(yaml_object["guard"][name]) is not int or yaml_object["guard"][name] < 1:
+                raise RuntimeError("Style configuration error.")
+        settings["guard"] = dict(file_guard.DEFAULT_THRESHOLDS, **yaml_object["guard"])
+
+    global configuration, dispatcher
     configuration = style_config
+    dispatcher = style_dispatch.StyleDispatcher(style_config, yaml_object.get("exclude", []))
+
+
+def range_arguments(diff, style):
+    """Returns styler arguments that restrict styling to line ranges changed by diff.
+    If style class has "range_argument" (e.g. "--lines={first}:{last}" for clang-format),
+    there is one argument per range, first and last are 1-based and inclusive.
+    Returns empty list if style class can only style whole files,
+    None if there are no changed lines to style."""
+
+    if "range_argument" not in style:
+        return []
+
+    changes = diff_util.changed_compact(diff)
+    ranges = diff_util.line_ranges(line for start, length in zip(changes.out_starts, changes.out_lens) for line in range(start, start + length))
+    if not ranges:
+        return None
+
+    return [ style["range_argument"].format(first=start + 1, last=end) for start, end in ranges ]
+
+
+def style_changes(file, diff, style, cache=None, backend=None, ledger=None, content=None):
+    """Runs styler of style class on a file and diffs its output with the file.
+    content is content of the file (bytes), it's read from the working tree if not given.
+    backend is styler backend of the style class, subprocess backend by default.
+    If ledger is given and has suggestions for this file, content, diff and styler, they are reused.
+    If cache is given, styler output is looked up there first.
+    Raises diff_util.LimitExceeded if the file is bigger than "max_file_size" of style class
+    or styler runs out of its limits.
+    Returns dict with "suggestions" if they are already known (from ledger, or none as nothing is styled),
+    otherwise with "changes" (diff_engine.changed_lines of file and styled file, blocks only), "slices"
+    (dict: (start, one-past-last) line of every block in styled file -> its styled lines) and "ledger_key"
+    (key of the file in ledger, None without ledger), see add_suggestions. Neither the file nor its styled
+    output are kept, so results of many files stay small."""
+
+    if backend is None:
+        backend = styler_backends.SubprocessBackend(style)
+
+    arguments = range_arguments(diff, style)
+    if arguments is None:
+        return {"suggestions": []}
 
+    max_file_size = style.get("max_file_size")
+    size = len(content) if content is not None else os.path.getsize(file)
+    if max_file_size is not None and size > max_file_size:
+        raise diff_util.LimitExceeded("File size {size} is bigger than max_file_size {max_file_size}".format(
+            size=size, max_file_size=max_file_size))
 
-def check_changed_style(file, diff, styler, report_style_suggestion):
-    styled_file = diff_util.split_output(diff_util.run(styler + [file]))
-    style_unidiff = diff_util.split_output(diff_util.run(["sh", "style_diff.sh", file] + styler, valid_return_codes=[0, 1]))
+    if content is None:
+        with open(file, "rb") as original_file:
+            content = original_file.read()
+        instrumentation.record_bytes_read("files", len(content))
 
-    suggestions = changed_check_style.style_suggestions(diff, style_unidiff, True)
+    identity = backend.identity()
+    ledger_key = None
+    if ledger is not None:
+        ledger_key = ledger.key(file, content, style, diff, identity)
+        recorded = ledger.lookup(ledger_key)
+        if recorded is not None:
+            instrumentation.count("unchanged since ledger")
+            return {"suggestions": recorded}
 
-    if not suggestions:
-        return False
+    styled = None
+    if cache is not None:
+        key = cache.key(content, identity, style, arguments)
+        styled = cache.get(key)
 
-    for line in suggestions:
-        styled_suggestion = "\\n".join(styled_file[suggestions[line][0] : suggestions[line][1]])
-        report_style_suggestion(file, line, styled_suggestion)
+    if styled is None:
+        styled = backend.style(file, content, arguments)
+        if cache is not None:
+            cache.put(key, styled)
 
-    return True
+    if styled == content:
+        return {"changes": diff_util.CompactChanged(), "slices": {}, "ledger_key": ledger_key}
 
+    styled = diff_util.Output(styled)
+    changes = diff_engine.changed_lines(diff_util.Output(content).lines(), styled.lines(),
+                                        style.get("diff_algorithm", "difflib"), style.get("diff_linear_space", False))
+    ends = [ start + length for start, length in zip(changes.out_starts, changes.out_lens) ]
+    slices = { (start, end): styled.text(start, end) for start, end in zip(changes.out_starts, ends) }
+    return {"changes": changes, "slices": slices, "ledger_key": ledger_key}
 
-def main(github_token):
-    load_configuration()
 
-    commit_diff = diff_util.split_output(diff_util.run(["git", "diff", "HEAD~1"]))
-    commit_changed_files = diff_util.parse_git_diff(commit_diff)
+def add_suggestions(checked, ledger=None):
+    """Computes suggestions of all styled files at once, with a single style_suggestions_batch call
+    over their flat table. checked is list of (file, diff, style_changes result),
+    "suggestions" (list of (line, styled_suggestion) tuples sorted by line) are added to the results
+    that don't have them yet and recorded in ledger if it's given."""
 
-    any_suggestions = False
+    styled = [ (file, diff, result) for file, diff, result in checked if "suggestions" not in result ]
 
-    def report_style_suggestions(file, line, suggestion):
-        print("file {}, line {}:".format(file, line+1))
-        print(suggestion)
+    table = changed_check_style.style_suggestions_batch([ (file, diff, result["changes"]) for file, diff, result in styled ], True)
 
-        if github_token is not None:
-            diff_util.run(["sh", "github_create_commit_comment.sh", file, str(line), "Suggested formatting:\\n".format(line + 1) + "```\\n" + suggestion + "\\n```", github_token])
+    results = { file: result for file, _, result in styled }
+    for result in results.values():
+        result["suggestions"] = []
+    for file, line, start, end in table:
+        results[file]["suggestions"].append((line, results[file]["slices"][start, end]))
+
+    if ledger is not None:
+        for file, _, result in styled:
+            ledger.record(result["ledger_key"], file, result["suggestions"])
+
+
+def skip_reason(changed_file_data):
+    """Returns why a changed file (parse_git_diff data) can't get style suggestions,
+    so that its styler doesn't need to run at all, or None if it has to be checked."""
+
+    if changed_file_data["deleted"]:
+        return "deleted"
+
+    unidiff = changed_file_data["unidiff"]
+    if not unidiff:
+        # e.g. empty new file, pure renames and mode changes have no "index" line and aren't parsed at all
+        return "no content changes"
+
+    if unidiff[0].startswith("Binary files") or unidiff[0].startswith("GIT binary patch"):
+        return "binary"
+
+    if not any(line.startswith("+") for line in unidiff[2:]):
+        return "deletions only"
+
+    return None
+
+
+def check_files(checks, jobs, cache=None, ledger=None, contents=None):
+    """Runs style_changes for every (file, diff, style, backend) in checks,
+    using up to jobs concurrent workers, then computes suggestions of all files at once (see add_suggestions).
+    contents is dict: file -> content, files are read from the working tree if it's not given.
+    Files that are too big or whose styler runs out of its limits are reported and skipped.
+    Returns list of (file, suggestions) in the same order as checks."""
+
+    def check(file, diff, style, backend):
+        with instrumentation.file_timer(file):
+            try:
+                return style_changes(file, diff, style, cache, backend, ledger, contents[file] if contents is not None else None)
+            except diff_util.LimitExceeded as error:
+                print("skipped {}: {}".format(file, error))
+                instrumentation.count("skipped: limits exceeded")
+                return {"suggestions": []}
+
+    if jobs <= 1 or len(checks) <= 1:
+        results = [ check(*check_data) for check_data in checks ]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [ executor.submit(check, *check_data) for check_data in checks ]
+            results = [ future.result() for future in futures ]
 
+    add_suggestions([ (file, diff, result) for (file, diff, _, _), result in zip(checks, results) ], ledger)
+    return [ (check_data[0], result["suggestions"]) for check_data, result in zip(checks, results) ]
+
+
+def report_on_github(github_token, comments, review, sha=None):
+    """Posts comments either as separate commit comments or as a single pull request review,
+    on commit sha (GITHUB_SHA by default)."""
+
+    import github_reporter
+
+    reporter = github_reporter.GitHubReporter.from_environment(github_token, sha)
+
+    if review:
+        pull_number = github_reporter.pull_request_number()
+        if pull_number is None:
+            raise RuntimeError("Review mode requires a pull request event.")
+        reporter.post_review(pull_number, comments)
+    else:
+        reporter.post_commit_comments(comments)
+
+
+def report_target(review, sha):
+    """Returns where comments are reported, used to tell already reported comments apart:
+    "pull/N" for pull request reviews, "commit/SHA" for commit comments."""
+
+    if review:
+        import github_reporter
+        pull_number = github_reporter.pull_request_number()
+        if pull_number is not None:
+            return "pull/{}".format(pull_number)
+
+    return "commit/{}".format(sha)
+
+
+def diff_base(base, revision="HEAD"):
+    """Returns revision to diff against: parent of revision (the commit only) if base is None,
+    otherwise merge base of base and revision, so that the whole branch is checked at once,
+    with the same diff a pull request from revision into base shows."""
+
+    if base is None:
+        return revision + "~1"
+
+    return diff_util.run(["git", "merge-base", base, revision]).strip()
+
+
+def pull_request_range(review, base, revision):
+    """Returns (base, revision) to check. On a pull_request event the working tree is a merge commit
+    that isn't part of the pull request, so with review or base and no revision the pull request head
+    is checked from git objects, against its merge base with base, "origin/" + GITHUB_BASE_REF by default.
+    Otherwise base and revision are returned as they are."""
+
+    if revision is not None or not (review or base is not None):
+        return base, revision
+
+    import github_reporter
+    head = github_reporter.pull_request_head()
+    if head is None:
+        return base, revision
+
+    if base is None:
+        if not os.environ.get("GITHUB_BASE_REF"):
+            raise RuntimeError("Pull request review needs --base or GITHUB_BASE_REF.")
+        base = "origin/" + os.environ["GITHUB_BASE_REF"]
+
+    return base, head
+
+
+def backend_key(style, jobs):
+    """Returns key of styler backend for style class configuration, backends with equal keys are interchangeable."""
+    return json.dumps([style, jobs], sort_keys=True)
+
+
+def check_commit(github_token, jobs=None, review=False, cache_dir=None, base=None, ledger_path=None, revision=None,
+                 backends=None):
+    """Checks style of files changed by the last commit, or by all commits since base
+    (see diff_base), prints and reports suggestions. Suggestions for a base range
+    are positioned on the pull request diff, so they are always reported as a review.
+    If revision is given, that commit is checked instead of the working tree, files are read
+    from git objects in one batch and piped to stylers, so no checkout is needed.
+    With a suggestion ledger (ledger_path or "ledger" setting), files unchanged since
+    a previous run aren't styled again and already reported suggestions aren't posted again.
+    If backends dict is given, styler backends are taken from it by backend_key, new ones are added there
+    and all of them are left open, so that they (e.g. worker pools) are shared between calls.
+    Returns list of suggestion comments."""
+
+    with instrumentation.stage("load_configuration"):
+        load_configuration()
+
+    if jobs is None:
+        jobs = settings["jobs"]
+
+    if cache_dir is None:
+        cache_dir = settings["cache_dir"]
+    cache = style_cache.StyleCache(cache_dir, settings["cache_max_size"]) if cache_dir else None
+
+    if ledger_path is None:
+        ledger_path = settings["ledger"]
+    ledger = None
+    if ledger_path:
+        import suggestion_ledger
+        ledger = suggestion_ledger.SuggestionLedger(ledger_path)
+
+    def has_style_class(path):
+        return dispatcher.resolve(path) is not None
+
+    base_revision = diff_base(base) if revision is None else diff_base(base, revision)
+
+    def max_file_size(path):
+        return configuration[dispatcher.resolve(path)].get("max_file_size")
+
+    with instrumentation.stage("guard"):
+        guarded, guard_contents = file_guard.guard(base_revision, revision, has_style_class, settings["guard"], max_file_size)
+    for path in sorted(guarded):
+        print("skipped {}: {}".format(path, guarded[path]))
+        instrumentation.count("skipped: " + guarded[path].split(":")[0])
+
+    def is_checked(path):
+        return path not in guarded and has_style_class(path)
+
+    with instrumentation.stage("git_diff"):
+        git_diff_command = ["git", "diff", base_revision] + ([revision] if revision is not None else [])
+        commit_changed_files = diff_util.parse_git_diff(diff_util.run_lines(git_diff_command), is_checked)
+
+    shared_backends = backends is not None
+    if not shared_backends:
+        backends = {}
+    class_backends = {}
+    checks = []
+    skipped = {}
     for changed_file in commit_changed_files:
+        reason = skip_reason(commit_changed_files[changed_file])
+        if reason is not None:
+            skipped[reason] = skipped.get(reason, 0) + 1
+            instrumentation.count("skipped: " + reason)
+            continue
+
+        style_class = dispatcher.resolve(changed_file)
+        if style_class not in class_backends:
+            key = backend_key(configuration[style_class], jobs)
+            if key not in backends:
+                backends[key] = styler_backends.create(configuration[style_class], jobs)
+            class_backends[style_class] = backends[key]
+        checks.append((changed_file, commit_changed_files[changed_file]["unidiff"], configuration[style_class], class_backends[style_class]))
+
+    if skipped:
+        print("skipped {} files without styler: {}".format(sum(skipped.values()),
+              ", ".join("{} {}".format(skipped[reason], reason) for reason in sorted(skipped))))
+
+    try:
+        contents = None
+        if revision is not None:
+            for style_class in class_backends:
+                if not class_backends[style_class].reads_content:
+                    raise RuntimeError("Style class {} needs stdin_argument to check files from git objects.".format(style_class))
+            with instrumentation.stage("read_blobs"):
+                contents = { check[0]: guard_contents[check[0]] for check in checks if check[0] in guard_contents }
+                contents.update(diff_util.read_blobs(revision, [ check[0] for check in checks if check[0] not in contents ]))
+            instrumentation.record_bytes_read("git objects", sum(len(content) for content in contents.values()))
+
+        with instrumentation.stage("check_files"):
+            checked = check_files(checks, jobs, cache, ledger, contents)
+    finally:
+        if not shared_backends:
+            for backend in backends.values():
+                backend.close()
+
+    comments = []
+    for file, suggestions in checked:
+        for line, suggestion in suggestions:
+            print("file {}, line {}:".format(file, line+1))
+            print(suggestion)
+            comments.append({"path": file, "position": line, "body": "Suggested formatting:\n```\n" + suggestion + "\n```"})
 
-        for style_class in configuration:
-            for suffix in configuration[style_class]["suffixes"]:
-                if changed_file.endswith(suffix):
-                    if check_changed_style(changed_file, commit_changed_files[changed_file]["unidiff"], configuration[style_class]["styler_command"], report_style_suggestions):
-                        any_suggestions = True
-                    continue
+    if cache is not None:
+        with instrumentation.stage("cache_evict"):
+            cache.evict()
 
-    if any_suggestions:
+    if ledger is None and (github_token is None or not comments):
+        return comments
+
+    # comments are positioned on the diff of the checked commit, so they are posted on it
+    sha = diff_util.run(["git", "rev-parse", "--verify", (revision or "HEAD") + "^{commit}"]).strip()
+
+    new_comments = comments
+    if ledger is not None:
+        target = report_target(review or base is not None, sha)
+        new_comments = [ comment for comment in comments if not ledger.is_reported(target, comment) ]
+        if len(new_comments) < len(comments):
+            print("{} suggestions were already reported".format(len(comments) - len(new_comments)))
+
+    if github_token is not None and new_comments:
+        with instrumentation.stage("report_on_github"):
+            report_on_github(github_token, new_comments, review or base is not None, sha)
+        if ledger is not None:
+            ledger.mark_reported(target, new_comments)
+
+    if ledger is not None:
+        ledger.save()
+
+    return comments
+
+
+def main(github_token, jobs=None, review=False, cache_dir=None, stats=None, profile=None, base=None, ledger_path=None, revision=None):
+    """Runs check_commit, exits with code 1 if there are suggestions.
+    If stats is given, writes instrumentation report there (see instrumentation.write_report),
+    profile is None, "cprofile" or "tracemalloc".
+    Reviews of pull requests check the pull request range, see pull_request_range."""
+
+    base, revision = pull_request_range(review, base, revision)
+
+    try:
+        with instrumentation.profile(profile):
+            comments = check_commit(github_token, jobs, review, cache_dir, base, ledger_path, revision)
+    finally:
+        if stats is not None:
+            instrumentation.write_report(stats)
+
+    if comments:
         exit(1)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
-        print("usage:\n\t{cmd} [github_token]".format(cmd=sys.argv[0]))
-        exit(1)
+    parser = argparse.ArgumentParser(description="Checks style of files changed by the last commit, or by all commits since --base.")
+    parser.add_argument("github_token", nargs="?", default=None, help="GitHub token used to post style suggestion comments")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="number of files checked concurrently")
+    parser.add_argument("--cache-dir", default=None, help="directory of persistent styler output cache")
+    parser.add_argument("--revision", default=None, help="check this commit reading files from git objects instead of "
+                                                         "the working tree, needs stdin_argument for styler commands")
+    parser.add_argument("--ledger", default=None, help="suggestion ledger file, keep it between runs to skip unchanged files "
+                                                       "and avoid posting the same suggestions again")
+    parser.add_argument("--review", action="store_true", help="post all suggestions as a single pull request review, "
+                                                              "on pull_request events the same as --base origin/$GITHUB_BASE_REF")
+    parser.add_argument("--base", default=None, help="check the net diff of all commits since merge base with this ref "
+                                                     "(e.g. pull request target branch), implies --review, on pull_request "
+                                                     "events the pull request head is checked as --revision")
+    parser.add_argument("--stats", default=None, help="write timings, subprocess and I/O statistics as JSON to this file, "
+                                                      "\"github\" appends them to GitHub step summary")
+    parser.add_argument("--profile", choices=["cprofile", "tracemalloc"], default=None, help="profile Python stages, results go into --stats")
+    args = parser.parse_args()
 
-    if len(sys.argv) < 2:
-        main(None)
-    else:
-        main(sys.argv[1])
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    main(args.github_token, args.jobs, args.review, args.cache_dir, args.stats, args.profile, args.base, args.ledger, args.revision)
@@ -0,0 +1,98 @@
+import difflib
+
+
+# lines repeated all over real source files, they make diffs ambiguous
+COMMON_LINES = ["", "{", "}", "    }", "    return 0;", "#include <iostream>"]
+
+
+def random_source(generator, lines, common_rate=0.2):
+    """Returns list of lines of a random source file, common_rate of them are COMMON_LINES."""
+
+    return [ generator.choice(COMMON_LINES) if generator.random() < common_rate
+             else "    int value{} = {};".format(generator.randrange(lines * 4 + 1), generator.randrange(100))
+             for _ in range(lines) ]
+
+
+def mutate(generator, source, change_rate=0.02, max_change=5):
+    """Returns a changed copy of source: at change_rate of lines up to max_change lines
+    are deleted, inserted or replaced."""
+
+    result = []
+    i = 0
+    while i < len(source):
+        if generator.random() < change_rate:
+            kind = generator.choice(("delete", "insert", "replace"))
+            if kind != "insert":
+                i += generator.randint(1, max_change)
+            if kind != "delete":
+                result += random_source(generator, generator.randint(1, max_change))
+        else:
+            result.append(source[i])
+            i += 1
+    return result
+
+
+def random_file_pair(generator, max_lines):
+    """Returns (a, b) random file and its random change, sizes and change rates vary from pair to pair."""
+
+    a = random_source(generator, generator.randint(0, max_lines))
+    return a, mutate(generator, a, generator.choice((0.0, 0.001, 0.01, 0.05, 0.3)))
+
+
+def unidiff(a, b, context=3):
+    """Returns unified diff of lists of lines a and b with context lines around changes."""
+    return list(difflib.unified_diff(a, b, "a", "b", n=context, lineterm=""))
+
+
+def reference_changed(a, b, context=3):
+    """Reference implementation of diff_util.changed(unidiff(a, b, context)): computes the same result
+    from difflib opcodes the unified diff is made of, without parsing the diff text."""
+
+    result = {"changed_in": {}, "changed_out": {}, "blocks": [], "in": {}, "out": {}}
+    diff_line = 2
+    for group in difflib.SequenceMatcher(None, a, b).get_grouped_opcodes(context):
+        diff_line += 1
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for offset in range(i2 - i1):
+                    result["in"][i1 + offset] = diff_line
+                    result["out"][j1 + offset] = diff_line
+                    diff_line += 1
+                continue
+
+            block = len(result["blocks"])
+            result["blocks"].append({"in_start": i1, "in_len": i2 - i1, "out_start": j1, "out_len": j2 - j1})
+            for i in range(i1, i2):
+                result["in"][i] = diff_line
+                result["changed_in"][i] = block
+                diff_line += 1
+            for j in range(j1, j2):
+                result["out"][j] = diff_line
+                result["changed_out"][j] = block
+                diff_line += 1
+    return result
+
+
+def reference_translate(line_number, map_data):
+    """Reference implementation of changed_check_style.translate_line_numbers_onto_diff_for_github
+    with translation on, by linear search: line's own diff line, else the one of the next line
+    mentioned in the diff, else of the previous one, else 1."""
+
+    if line_number in map_data:
+        return map_data[line_number] - 2
+    larger = [ line for line in map_data if line > line_number ]
+    if larger:
+        return map_data[min(larger)] - 2
+    smaller = [ line for line in map_data if line < line_number ]
+    if smaller:
+        return map_data[max(smaller)] - 2
+    return 1
+
+
+def scaled_diff(lines, change_every=50):
+    """Returns unidiff of a file of lines lines with every change_every-th line changed, made without difflib."""
+
+    diff = ["--- a", "+++ b", "@@ -1,{0} +1,{0} @@".format(lines)]
+    for line in range(lines):
+        diff += ["-{}".format(line), "+{}.".format(line)] if line % change_every == 0 else [" {}".format(line)]
+    return diff
@@ -0,0 +1,293 @@
+import diff_util
+import difflib
+
+
+ALGORITHMS = ("difflib", "myers", "patience")
+
+# Myers diff takes O(D^2) time and memory (O(D * (N + M)) time in linear space), D is number of changed lines,
+# ranges that need more changes than this, e.g. re-indented files, are diffed with difflib instead
+MAX_EDIT_DISTANCE = 256
+
+
+def _common_prefix(a, a_lo, a_hi, b, b_lo, b_hi):
+    length = 0
+    while a_lo + length < a_hi and b_lo + length < b_hi and a[a_lo + length] == b[b_lo + length]:
+        length += 1
+    return length
+
+
+def _common_suffix(a, a_lo, a_hi, b, b_lo, b_hi):
+    length = 0
+    while a_lo < a_hi - length and b_lo < b_hi - length and a[a_hi - length - 1] == b[b_hi - length - 1]:
+        length += 1
+    return length
+
+
+def _difflib(a, a_lo, a_hi, b, b_lo, b_hi, matches):
+    """Diffs a[a_lo:a_hi] and b[b_lo:b_hi] with difflib.SequenceMatcher, the same way as unified diff
+    of difflib does, appends (a_start, b_start, length) of matching runs to matches, in order."""
+
+    matcher = difflib.SequenceMatcher(None, a[a_lo:a_hi], b[b_lo:b_hi])
+    matches.extend((a_lo + i, b_lo + j, length) for i, j, length in matcher.get_matching_blocks() if length)
+
+
+def _myers(a, a_lo, a_hi, b, b_lo, b_hi, matches, max_edit_distance=None):
+    """Greedy Myers diff of a[a_lo:a_hi] and b[b_lo:b_hi], keeps the furthest reaching path of every
+    diagonal for every edit distance d, so it needs O(D^2) memory, D is number of changed lines.
+    Appends (a_start, b_start, length) of matching runs to matches, in order.
+    Returns False without appending anything if D is bigger than max_edit_distance, otherwise True."""
+
+    n, m = a_hi - a_lo, b_hi - b_lo
+    offset = n + m + 1
+    v = [0] * (2 * offset + 1)
+    trace = []
+    done = False
+    for d in range(n + m + 1):
+        if max_edit_distance is not None and d > max_edit_distance:
+            return False
+        for diagonal in range(offset - d, offset + d + 1, 2):
+            if diagonal == offset - d or (diagonal != offset + d and v[diagonal - 1] < v[diagonal + 1]):
+                x = v[diagonal + 1]
+            else:
+                x = v[diagonal - 1] + 1
+            y = x - diagonal + offset
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            v[diagonal] = x
+            if x >= n and y >= m:
+                done = True
+                break
+        trace.append(v[offset - d : offset + d + 1])
+        if done:
+            break
+
+    # walk back from the end, previous path of diagonal k at distance d is at trace[d - 1][k + d - 1]
+    runs = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        previous = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = previous[previous_k + d - 1]
+        previous_y = previous_x - previous_k
+        start_x = previous_x if previous_k == k + 1 else previous_x + 1
+        if x > start_x:
+            runs.append((a_lo + start_x, b_lo + start_x - k, x - start_x))
+        x, y = previous_x, previous_y
+    if x > 0:
+        runs.append((a_lo, b_lo, x))
+
+    matches.extend(reversed(runs))
+    return True
+
+
+def _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi, max_edit_distance=None):
+    """Returns (x_start, y_start, x_end, y_end) of the middle snake of the shortest edit script of
+    a[a_lo:a_hi] and b[b_lo:b_hi], searching from both ends at once in O(N + M) memory.
+    Returns None if the edit script is longer than max_edit_distance."""
+
+    n, m = a_hi - a_lo, b_hi - b_lo
+    delta = n - m
+    odd = delta & 1
+    offset = n + m + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+    for d in range((n + m + 1) // 2 + 1):
+        # both searches reach d, so the edit script is at least 2 * d - 1 long
+        if max_edit_distance is not None and 2 * d - 1 > max_edit_distance:
+            return None
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1) and x + backward[offset + delta - k] >= n:
+                return a_lo + start_x, b_lo + start_y, a_lo + x, b_lo + y
+
+        # backward diagonal k is forward diagonal delta - k, x counts lines from the end
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a_hi - x - 1] == b[b_hi - y - 1]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return a_hi - x, b_hi - y, a_hi - start_x, b_hi - start_y
+
+    raise AssertionError("No middle snake found.")
+
+
+def _myers_linear_space(a, a_lo, a_hi, b, b_lo, b_hi, matches, max_edit_distance=None):
+    """The same as _myers, but divides the problem at middle snakes and needs O(N + M) memory.
+    Only the first middle snake search is bounded by max_edit_distance, it bounds the whole edit script."""
+
+    prefix = _common_prefix(a, a_lo, a_hi, b, b_lo, b_hi)
+    suffix = _common_suffix(a, a_lo + prefix, a_hi, b, b_lo + prefix, b_hi)
+
+    snake = None
+    if a_lo + prefix < a_hi - suffix and b_lo + prefix < b_hi - suffix:
+        snake = _middle_snake(a, a_lo + prefix, a_hi - suffix, b, b_lo + prefix, b_hi - suffix, max_edit_distance)
+        if snake is None:
+            return False
+
+    if prefix:
+        matches.append((a_lo, b_lo, prefix))
+        a_lo += prefix
+        b_lo += prefix
+    a_hi -= suffix
+    b_hi -= suffix
+
+    if snake is not None:
+        x_start, y_start, x_end, y_end = snake
+        _myers_linear_space(a, a_lo, x_start, b, b_lo, y_start, matches)
+        if x_end > x_start:
+            matches.append((x_start, y_start, x_end - x_start))
+        _myers_linear_space(a, x_end, a_hi, b, y_end, b_hi, matches)
+
+    if suffix:
+        matches.append((a_hi, b_hi, suffix))
+    return True
+
+
+def _unique_anchors(a, a_lo, a_hi, b, b_lo, b_hi):
+    """Returns (a_index, b_index) of lines that occur exactly once in both ranges,
+    longest sequence of them increasing in both files (patience sorting)."""
+
+    counts = {}
+    for i in range(a_lo, a_hi):
+        entry = counts.get(a[i])
+        counts[a[i]] = [1, i, 0, None] if entry is None else [entry[0] + 1, i, 0, None]
+    for j in range(b_lo, b_hi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[2] += 1
+            entry[3] = j
+
+    unique = sorted((entry[1], entry[3]) for entry in counts.values() if entry[0] == 1 and entry[2] == 1)
+
+    # piles hold indices into unique of pile tops, back links give the longest increasing subsequence
+    piles, tops, back = [], [], [None] * len(unique)
+    for index, (_, j) in enumerate(unique):
+        low, high = 0, len(tops)
+        while low < high:
+            middle = (low + high) // 2
+            if tops[middle] < j:
+                low = middle + 1
+            else:
+                high = middle
+        back[index] = piles[low - 1] if low else None
+        if low == len(tops):
+            tops.append(j)
+            piles.append(index)
+        else:
+            tops[low] = j
+            piles[low] = index
+
+    anchors = []
+    index = piles[-1] if piles else None
+    while index is not None:
+        anchors.append(unique[index])
+        index = back[index]
+    anchors.reverse()
+    return anchors
+
+
+def _patience(a, a_lo, a_hi, b, b_lo, b_hi, matches, fallback):
+    """Patience diff: matches lines unique in both ranges first, then diffs ranges between them
+    the same way, ranges without unique lines are diffed with fallback."""
+
+    prefix = _common_prefix(a, a_lo, a_hi, b, b_lo, b_hi)
+    if prefix:
+        matches.append((a_lo, b_lo, prefix))
+        a_lo += prefix
+        b_lo += prefix
+    suffix = _common_suffix(a, a_lo, a_hi, b, b_lo, b_hi)
+    a_hi -= suffix
+    b_hi -= suffix
+
+    if a_lo < a_hi and b_lo < b_hi:
+        anchors = _unique_anchors(a, a_lo, a_hi, b, b_lo, b_hi)
+        if not anchors:
+            fallback(a, a_lo, a_hi, b, b_lo, b_hi, matches)
+        else:
+            for i, j in anchors:
+                _patience(a, a_lo, i, b, b_lo, j, matches, fallback)
+                matches.append((i, j, 1))
+                a_lo, b_lo = i + 1, j + 1
+            _patience(a, a_lo, a_hi, b, b_lo, b_hi, matches, fallback)
+
+    if suffix:
+        matches.append((a_hi, b_hi, suffix))
+
+
+def diff_blocks(lines_a, lines_b, algorithm="difflib", linear_space=False, max_edit_distance=MAX_EDIT_DISTANCE):
+    """Returns changed blocks between two lists of lines (str or bytes), the same "blocks" as
+    diff_util.changed returns for their unidiff: list of dict with "in_start", "in_len", "out_start",
+    "out_len", 0-based, in order. Lines are compared in-process, no unidiff text is produced.
+    algorithm is "difflib" (the same blocks as unified diff of difflib), "myers" (shortest edit script)
+    or "patience" (matches lines unique in both files first, which aligns suggestions with moved or duplicated
+    code better). linear_space makes Myers use O(N + M) memory instead of O(D^2), D is number of changed lines.
+    Ranges that Myers can't diff within max_edit_distance changes are diffed with difflib."""
+
+    if algorithm not in ALGORITHMS:
+        raise ValueError("Unknown diff algorithm: {algorithm}".format(algorithm=algorithm))
+
+    if lines_a == lines_b:
+        return []
+
+    # compare small integers instead of lines
+    ids = {}
+    a = [ ids.setdefault(line, len(ids)) for line in lines_a ]
+    b = [ ids.setdefault(line, len(ids)) for line in lines_b ]
+
+    myers = _myers_linear_space if linear_space else _myers
+
+    def bounded_myers(a, a_lo, a_hi, b, b_lo, b_hi, matches):
+        if not myers(a, a_lo, a_hi, b, b_lo, b_hi, matches, max_edit_distance):
+            _difflib(a, a_lo, a_hi, b, b_lo, b_hi, matches)
+
+    matches = []
+    if algorithm == "difflib":
+        _difflib(a, 0, len(a), b, 0, len(b), matches)
+    elif algorithm == "patience":
+        _patience(a, 0, len(a), b, 0, len(b), matches, bounded_myers)
+    else:
+        prefix = _common_prefix(a, 0, len(a), b, 0, len(b))
+        suffix = _common_suffix(a, prefix, len(a), b, prefix, len(b))
+        if prefix:
+            matches.append((0, 0, prefix))
+        bounded_myers(a, prefix, len(a) - suffix, b, prefix, len(b) - suffix, matches)
+        if suffix:
+            matches.append((len(a) - suffix, len(b) - suffix, suffix))
+
+    blocks = []
+    a_position, b_position = 0, 0
+    for a_start, b_start, length in matches + [(len(a), len(b), 0)]:
+        if a_start > a_position or b_start > b_position:
+            blocks.append({"in_start": a_position, "in_len": a_start - a_position,
+                           "out_start": b_position, "out_len": b_start - b_position})
+        a_position, b_position = a_start + length, b_start + length
+    return blocks
+
+
+def changed_lines(lines_a, lines_b, algorithm="difflib", linear_space=False):
+    """Returns blocks of lines_a and lines_b computed with diff_blocks as diff_util.CompactChanged,
+    the same blocks as diff_util.changed returns for their unidiff. Per-line maps aren't built,
+    style suggestions only need blocks."""
+
+    return diff_util.CompactChanged(diff_blocks(lines_a, lines_b, algorithm, linear_space))
@@ -1,64 +1,209 @@
-import unittest
+import instrumentation
+import array
+import bisect
+import collections.abc
+import difflib
+import os
 import re
+import resource
+import signal
 import subprocess
+import time
+
+GIT_DIFF_FILE_HEADER_PATTERN = re.compile("diff --git a/(.+) b/(.+)")
+HUNK_HEADER_PATTERN = re.compile(r"@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
 
 def parse_git_diff_file_header(line):
-    match = re.fullmatch( "diff --git a/(.+) b/(.+)", line )
+    match = GIT_DIFF_FILE_HEADER_PATTERN.fullmatch(line)
     if match is None:
         raise ValueError("Malformed git diff file header: {line}".format(line = line))
 
     return match.groups()[1]
 
 
-def parse_git_diff(git_diff):
+def iter_git_diff(git_diff, accept=None):
+    """Parses output of "git diff" command lazily, in a single pass.
+    Accepts any iterable of lines, e.g. run_lines generator reading "git diff" output.
+    Yields (file_path_name, changed_file_data) tuples, changed file data is the same as in
+    parse_git_diff result. If accept is given, it's called with file path name and
+    files it rejects are skipped without storing their diff."""
+
+    filename = None
+    file_data = None
+    in_header = False
+
+    for line in git_diff:
+        if line.startswith("diff --git"):
+            if file_data is not None:
+                yield filename, file_data
+            filename = parse_git_diff_file_header(line)
+            file_data = None
+            in_header = True
+            flags = { "new_file": False, "deleted": False, "renamed": False }
+            accepted = accept is None or accept(filename)
+        elif filename is None:
+            raise ValueError("Expected git diff file header.")
+        elif in_header:
+            if line.startswith("index"):
+                in_header = False
+                if accepted:
+                    file_data = { "unidiff": [] }
+                    file_data.update(flags)
+            elif line.startswith("new file"):
+                flags["new_file"] = True
+            elif line.startswith("deleted file"):
+                flags["deleted"] = True
+            elif line.startswith("rename"):
+                flags["renamed"] = True
+        elif file_data is not None:
+            file_data["unidiff"].append(line)
+
+    if file_data is not None:
+        yield filename, file_data
+
+
+def parse_git_diff(git_diff, accept=None):
     """Parses output of "git diff" command.
     Returns dict in following form: {file_path_name: changed_file_data}
     Where cahnged file data is: {"unidiff": list_of_lines_of_diff_for_that_file, 
                                  "deleted": flag_whether_file_was_deleted,
                                  "new_file": flag_whether_this_file_is_new,
-                                 "renamed": flag_whether_this_file_was_renamed}"""
-
-    i = 0
-    parsed = {}
-    while i < len(git_diff):
-
+                                 "renamed": flag_whether_this_file_was_renamed}
+    If accept is given, only files it accepts are parsed, see iter_git_diff."""
+
+    return dict(iter_git_diff(git_diff, accept))
+
+
+class LimitExceeded(RuntimeError):
+    """Command ran out of its time or resource limits, or a file is too big to style."""
+
+
+def _resource_limiter(limits):
+    """Returns function that sets "memory_limit" and "cpu_limit" of limits on the calling process,
+    to be run in the child process between fork and exec, so that command never runs unlimited.
+    Returns None if there are no such limits."""
+
+    resource_limits = [ (resource_limit, int(limits[name])) for name, resource_limit in
+                        (("memory_limit", resource.RLIMIT_AS), ("cpu_limit", resource.RLIMIT_CPU)) if limits.get(name) is not None ]
+    if not resource_limits:
+        return None
+
+    def set_resource_limits():
+        # runs in the forked child, only calls setrlimit, nothing that could wait on locks of other threads
+        for resource_limit, value in resource_limits:
+            resource.setrlimit(resource_limit, (value, value))
+
+    return set_resource_limits
+
+
+def run(command, valid_return_codes=[0], ignore_return=False, input=None, decode=True, limits={}):
+    """Runs command, feeding input (bytes) to its stdin if given.
+    Returns its output, decoded (undecodable bytes replaced) if decode is True.
+    limits may contain "timeout" (wall-clock seconds), "cpu_limit" (CPU seconds) and "memory_limit"
+    (bytes of address space). Command is killed when it runs out of time, LimitExceeded is raised
+    then and when command is killed by a signal or fails while its CPU or memory is limited."""
+
+    start = time.perf_counter()
+    with subprocess.Popen(command, stdin=subprocess.PIPE if input is not None else None,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          start_new_session="timeout" in limits, preexec_fn=_resource_limiter(limits)) as process:
+        try:
+            stdout, _ = process.communicate(input, timeout=limits.get("timeout"))
+        except subprocess.TimeoutExpired:
+            # kill the whole process group, so that children of command don't keep its output open
+            os.killpg(process.pid, signal.SIGKILL)
+            process.communicate()
+            instrumentation.record_subprocess(command, time.perf_counter() - start, 0)
+            raise LimitExceeded("Command {command} timed out after {timeout} seconds".format(
+                command=command, timeout=limits["timeout"]))
+
+    instrumentation.record_subprocess(command, time.perf_counter() - start, len(stdout))
+    resource_limited = limits.get("cpu_limit") is not None or limits.get("memory_limit") is not None
+    if process.returncode < 0 and resource_limited:
+        raise LimitExceeded("Command {command} was killed by signal {signal}, CPU or memory limit exceeded".format(
+            command=command, signal=signal.Signals(-process.returncode).name))
+    if not ignore_return and process.returncode not in valid_return_codes and resource_limited:
+        # commands running out of memory usually fail to allocate it and exit with an error instead of being killed
+        raise LimitExceeded("Command {command} returned non-zero code {code}, CPU or memory limit likely exceeded".format(
+            command=command, code=process.returncode))
+    if not ignore_return and process.returncode not in valid_return_codes:
+        raise RuntimeError("Command {command} returned non-zero code: {code}".format(
+            command=command, code=process.returncode))
+    return stdout.decode(errors="replace") if decode else stdout
+
+
+def read_blobs(revision, paths):
+    """Reads contents of files at revision from git objects with a single "git cat-file --batch",
+    without touching the working tree. Returns dict: path -> content (bytes),
+    paths missing at revision are left out."""
+
+    if not paths:
+        return {}
+
+    requests = "".join("{}:{}\n".format(revision, path) for path in paths).encode()
+    output = run(["git", "cat-file", "--batch"], input=requests, decode=False)
+
+    blobs = {}
+    position = 0
+    for path in paths:
+        header_end = output.index(b"\n", position)
+        header = output[position:header_end].split()
+        position = header_end + 1
+        if header[-1] == b"missing" or header[-1] == b"ambiguous":
+            continue
+        size = int(header[2])
+        if header[1] == b"blob":
+            blobs[path] = output[position:position + size]
+        position += size + 1
+
+    return blobs
+
+
+def run_lines(command, valid_return_codes=[0]):
+    """Runs command and yields lines of its output (without line ends) as they are read,
+    without keeping the whole output in memory. Undecodable bytes are replaced."""
+
+    start = time.perf_counter()
+    output_bytes = 0
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as process:
+        for line in process.stdout:
+            output_bytes += len(line)
+            yield (line[:-1] if line.endswith(b"\n") else line).decode(errors="replace")
+        process.wait()
+    instrumentation.record_subprocess(command, time.perf_counter() - start, output_bytes)
+
+    if process.returncode not in valid_return_codes:
+        raise RuntimeError("Command {command} returned non-zero code: {code}".format(
+            command=command, code=process.returncode))
 
-        if not git_diff[i].startswith("diff --git"):
-            raise ValueError("Expected git diff file header.")
-        filename = parse_git_diff_file_header(git_diff[i])
-        i += 1
 
-        deleted = False
-        renamed = False
-        new_file = False
+class Output(collections.abc.Sequence):
+    """Command output or file content kept as raw bytes, a sequence of its lines (bytes, without line ends,
+    like split_output). Lines are split once, only the text that is asked for is decoded,
+    undecodable bytes are replaced per slice."""
 
-        while i < len(git_diff) and not git_diff[i].startswith("diff --git") and not git_diff[i].startswith("index"):
-            if git_diff[i].startswith("new file"):
-                new_file = True
-            elif git_diff[i].startswith("deleted file"):
-                deleted = True
-            elif git_diff[i].startswith("rename"):
-                renamed = True
-            i += 1
+    __slots__ = ("data", "split_lines")
 
-        if i < len(git_diff) and git_diff[i].startswith("index"):
-            i += 1
-            file_unidiff = []
-            while i < len(git_diff) and not git_diff[i].startswith("diff --git"):
-                file_unidiff.append(git_diff[i])
-                i += 1
+    def __init__(self, data):
+        self.data = data
+        self.split_lines = data.split(b"\n")
+        if self.split_lines[-1] == b"":
+            self.split_lines.pop()
 
-            parsed[filename] = { "unidiff": file_unidiff, "new_file": new_file, "deleted": deleted, "renamed": renamed }
+    def __len__(self):
+        return len(self.split_lines)
 
-    return parsed
+    def __getitem__(self, index):
+        return self.split_lines[index]
 
+    def lines(self):
+        """Returns list of all lines (bytes), the list is shared, don't modify it."""
+        return self.split_lines
 
-def run(command, valid_return_codes=[0], ignore_return=False):
-    r = subprocess.run(command, capture_output=True)
-    if not ignore_return and r.returncode not in valid_return_codes:
-        raise RuntimeError("Command {command} returned non-zero code: {code}".format(
-            command=command, code=r.returncode))
-    return r.stdout.decode()
+    def text(self, start, stop):
+        """Returns lines from start to one-past-last stop joined with "\\n", decoded."""
+        return b"\n".join(self.split_lines[start:stop]).decode(errors="replace")
 
 
 def split_output(output):
@@ -74,12 +219,30 @@ def diff(file_a, file_b):
     return split_output(raw_unidiff)
 
 
+def diff_lines(lines_a, lines_b, name_a="a", name_b="b"):
+    """Returns unidiff between two lists of lines, computed in-process 
+    without spawning "diff". Returns list of strings.
+    Lines may also be bytes (e.g. from Output.lines()), then diff lines are decoded
+    with undecodable bytes replaced, so that non-UTF-8 files can be compared."""
+
+    if (lines_a and type(lines_a[0]) is bytes) or (lines_b and type(lines_b[0]) is bytes):
+        unidiff = difflib.diff_bytes(difflib.unified_diff, lines_a, lines_b, name_a.encode(), name_b.encode(), lineterm=b"")
+        return [ line.decode(errors="replace") for line in unidiff ]
+
+    return list(difflib.unified_diff(lines_a, lines_b, name_a, name_b, lineterm=""))
+
+
 def parse_hunk_header(line):
-    match = re.fullmatch( "@@ \-(\d+),\d+ \+(\d+),\d+ @@.*", line )
+    """Returns tuple of 0-based first lines of the hunk in "in" and "out" files.
+    Line counts may be omitted from the header ("@@ -5 +5 @@"), as diff does for single-line ranges.
+    An empty range ("-5,0") starts after the line it names, so its 0-based first line is that line number."""
+
+    match = HUNK_HEADER_PATTERN.match(line)
     if match is None:
         raise ValueError("Malformed hunk header: {line}".format(line = line))
 
-    return ( int(k)-1 for k in match.groups() )
+    in_start, in_count, out_start, out_count = match.groups()
+    return ( int(in_start) - (in_count != "0"), int(out_start) - (out_count != "0") )
 
 
 def changed(diff):
@@ -100,6 +263,120 @@ def changed(diff):
 
     result = {"changed_in": {}, "changed_out": {}, "blocks": [], "in": {}, "out": {}}
 
+    if len(diff) == 0:
+        return result
+
+    if len(diff) < 3:
+        raise ValueError("Too few lines in the diff.")
+    if not diff[0].startswith("---"):
+        raise ValueError("Expected line with in-file information.")
+    if not diff[1].startswith("+++"):
+        raise ValueError("Expected line with out-file information.")
+
+    changed_in, changed_out, blocks = result["changed_in"], result["changed_out"], result["blocks"]
+    in_map, out_map = result["in"], result["out"]
+
+    in_i, out_i = parse_hunk_header(diff[2])
+    block = None
+    for i in range(3, len(diff)):
+        line = diff[i]
+        prefix = line[:1]
+        if prefix == " " or prefix == "":
+            block = None
+            in_map[in_i] = i
+            out_map[out_i] = i
+            in_i += 1
+            out_i += 1
+        elif prefix == "-":
+            if block is None or block["out_len"]:
+                block = {"in_start": in_i, "in_len": 0, "out_start": out_i, "out_len": 0}
+                blocks.append(block)
+            in_map[in_i] = i
+            changed_in[in_i] = len(blocks) - 1
+            in_i += 1
+            block["in_len"] += 1
+        elif prefix == "+":
+            if block is None:
+                block = {"in_start": in_i, "in_len": 0, "out_start": out_i, "out_len": 0}
+                blocks.append(block)
+            out_map[out_i] = i
+            changed_out[out_i] = len(blocks) - 1
+            out_i += 1
+            block["out_len"] += 1
+        elif prefix == "@":
+            block = None
+            in_i, out_i = parse_hunk_header(line)
+        elif prefix == "\\":
+            # "\ No newline at end of file"
+            pass
+        else:
+            raise ValueError("Unexpected line prefix, line number: {line_number}".format(line_number = i))
+
+    return result
+
+
+class CompactChanged:
+    """Parts of changed result that style suggestions need, in a compact form: blocks are four array("i")
+    columns (in_starts, in_lens, out_starts, out_lens) instead of a dict per block, and the "out" line map
+    is kept as runs of consecutive "out" lines mentioned on consecutive diff lines (run_starts,
+    run_diff_lines, run_lens) instead of a dict entry per line. See changed_compact.
+    If blocks (list of dicts, as "blocks" of changed) are given, they are added, without "out" line map."""
+
+    __slots__ = ("in_starts", "in_lens", "out_starts", "out_lens", "run_starts", "run_diff_lines", "run_lens")
+
+    def __init__(self, blocks=()):
+        self.in_starts, self.in_lens, self.out_starts, self.out_lens = (array.array("i") for _ in range(4))
+        self.run_starts, self.run_diff_lines, self.run_lens = (array.array("i") for _ in range(3))
+        for block in blocks:
+            self.add_block(block["in_start"], block["in_len"], block["out_start"], block["out_len"])
+
+    def __len__(self):
+        return len(self.in_starts)
+
+    def add_block(self, in_start, in_len, out_start, out_len):
+        self.in_starts.append(in_start)
+        self.in_lens.append(in_len)
+        self.out_starts.append(out_start)
+        self.out_lens.append(out_len)
+
+    def add_out_line(self, line, diff_line):
+        """Records that "out" line is mentioned on diff_line, lines must be added in increasing order."""
+
+        if self.run_lens and self.run_starts[-1] + self.run_lens[-1] == line and self.run_diff_lines[-1] + self.run_lens[-1] == diff_line:
+            self.run_lens[-1] += 1
+        else:
+            self.run_starts.append(line)
+            self.run_diff_lines.append(diff_line)
+            self.run_lens.append(1)
+
+    def blocks(self):
+        """Returns blocks as list of dicts, the same as "blocks" of changed."""
+
+        return [ {"in_start": in_start, "in_len": in_len, "out_start": out_start, "out_len": out_len}
+                 for in_start, in_len, out_start, out_len in zip(self.in_starts, self.in_lens, self.out_starts, self.out_lens) ]
+
+    def out_diff_line(self, line):
+        """Returns diff line number where "out" line is mentioned ("out" of changed), or if it isn't,
+        where the next mentioned line after it is, or the last one before it if there's none after.
+        Returns None if no "out" lines are mentioned. Takes O(log runs) time."""
+
+        if not self.run_starts:
+            return None
+
+        run = bisect.bisect_right(self.run_starts, line) - 1
+        if run >= 0 and line < self.run_starts[run] + self.run_lens[run]:
+            return self.run_diff_lines[run] + line - self.run_starts[run]
+        if run + 1 < len(self.run_starts):
+            return self.run_diff_lines[run + 1]
+        return self.run_diff_lines[run] + self.run_lens[run] - 1
+
+
+def changed_compact(diff):
+    """Returns the same blocks and "out" line map as changed, as CompactChanged,
+    without building the other per-line dicts. Accepts unidiff (list of strings)."""
+
+    result = CompactChanged()
+
     if len(diff) == 0:
         return result
 
@@ -111,307 +388,49 @@ def changed(diff):
         raise ValueError("Expected line with out-file information.")
 
     in_i, out_i = parse_hunk_header(diff[2])
-    i = 2
-    while i < len(diff):
-        if diff[i].startswith(" "):
-            result["in"][in_i] = i
-            result["out"][out_i] = i
+    in_block = False
+    for i in range(3, len(diff)):
+        line = diff[i]
+        prefix = line[:1]
+        if prefix == " " or prefix == "":
+            in_block = False
+            result.add_out_line(out_i, i)
+            in_i += 1
+            out_i += 1
+        elif prefix == "-":
+            if not in_block or result.out_lens[-1]:
+                result.add_block(in_i, 0, out_i, 0)
+                in_block = True
+            result.in_lens[-1] += 1
             in_i += 1
+        elif prefix == "+":
+            if not in_block:
+                result.add_block(in_i, 0, out_i, 0)
+                in_block = True
+            result.add_out_line(out_i, i)
+            result.out_lens[-1] += 1
             out_i += 1
-            i += 1
-        elif diff[i].startswith("@@"):
-            in_i, out_i = parse_hunk_header(diff[i])
-            i += 1
-        elif diff[i].startswith("-") or diff[i].startswith("+"):
-            new_block = {"in_start": in_i, "in_len": 0, "out_start": out_i, "out_len": 0}
-            while i < len(diff) and diff[i].startswith("-"):
-                result["in"][in_i] = i
-                result["changed_in"][in_i] = len(result["blocks"])
-                in_i += 1
-                new_block["in_len"] += 1
-                i += 1
-            while i < len(diff) and diff[i].startswith("+"):
-                result["out"][out_i] = i
-                result["changed_out"][out_i] = len(result["blocks"])
-                out_i += 1
-                new_block["out_len"] += 1
-                i += 1
-            result["blocks"].append(new_block)
+        elif prefix == "@":
+            in_block = False
+            in_i, out_i = parse_hunk_header(line)
+        elif prefix == "\\":
+            # "\ No newline at end of file"
+            pass
         else:
-            ValueError("Unexpected line prefix, line number: {line_number}".format(line_number = i))
+            raise ValueError("Unexpected line prefix, line number: {line_number}".format(line_number = i))
 
     return result
 
 
-class TestDiffUtil(unittest.TestCase):
-    def test_empty(self):
-        expected = {"changed_in": {}, "changed_out": {}, "blocks": [], "in": {}, "out": {}}
-        self.assertEqual(changed([]), expected)
-        self.assertEqual(changed(["---", "+++", "@@ -1,12 +1,13 @@"]), expected)
-
-    def test_malformed_header(self):
-        self.assertRaises(ValueError, changed, [""])
-        self.assertRaises(ValueError, changed, ["1--", "+++", "@@ -1,12 +1,13 @@"])
-        self.assertRaises(ValueError, changed, ["---", "1++", "@@ -1,12 +1,13 @@"])
-        self.assertRaises(ValueError, changed, ["---", "+++"])
-
-    def test_malformed_hunk_header(self):
-        self.assertRaises(ValueError, changed, ["---", "+++", ""])
-        self.assertRaises(ValueError, changed, ["---", "+++", "1@ -1,12 +1,13 @@"])
-        self.assertRaises(ValueError, changed, ["---", "+++", "@@ -1, +1,13 @@"])
-        self.assertRaises(ValueError, changed, ["---", "+++", "@@ -1,12 1,13 @@"])
-
-    def test_diff_small(self):
-        input = [ "--- a   2022-12-13 14:18:45.487729700 +0200",
-                  "+++ b   2022-12-13 14:18:55.380516200 +0200",
-                  "@@ -1,3 +1,3 @@",
-                  " 0",
-                  "-1",
-                  "+11",
-                  " 2" ]
-        expected = {"changed_in": {1:0}, "changed_out": {1:0}, 
-                    "blocks":[{"in_start": 1, "in_len": 1, "out_start": 1, "out_len": 1}],
-                    "in": {0: 3, 1: 4, 2: 6}, "out": {0: 3, 1: 5, 2: 6}}
-        self.assertEqual(changed(input), expected)
-
-    def test_diff_even_smaller(self):
-        input = [ "--- a   2022-12-13 14:18:45.487729700 +0200",
-                  "+++ b   2022-12-13 14:18:55.380516200 +0200",
-                  "@@ -1,1 +1,1 @@",
-                  "-1",
-                  "+11" ]
-        expected = {"changed_in": {0:0}, "changed_out": {0:0}, 
-                    "blocks":[{"in_start": 0, "in_len": 1, "out_start": 0, "out_len": 1}],
-                    "in": {0: 3}, "out": {0: 4}}
-        self.assertEqual(changed(input), expected)
-
-    def test_diff_small_consecutive(self):
-        input = [ "--- a   2022-12-13 14:18:45.487729700 +0200",
-                  "+++ b   2022-12-13 14:18:55.380516200 +0200",
-                  "@@ -1,3 +1,3 @@ what now",
-                  " 0",
-                  "-1",
-                  "+11",
-                  "-2",
-                  "+22",
-                  " 3" ]
-        expected = {"changed_in": {1:0, 2:1}, "changed_out": {1:0, 2:1}, 
-                    "blocks":[{"in_start": 1, "in_len": 1, "out_start": 1, "out_len": 1},
-                              {"in_start": 2, "in_len": 1, "out_start": 2, "out_len": 1}],
-                    "in": {0: 3, 1: 4, 2: 6, 3: 8}, "out": {0: 3, 1: 5, 2: 7, 3: 8}}
-        self.assertEqual(changed(input), expected)
-
-    def test_diff_big(self):
-        self.maxDiff = None
-        input = diff( "a", "b" )
-        expected = {"changed_in": {2: 0, 3: 0, 6: 1, 24: 3}, "changed_out": {4: 1, 7: 2, 8: 2, 9: 2, 25: 3},
-                    "blocks": [{"in_start": 2, "in_len": 2, "out_start": 2, "out_len": 0}, 
-                               {"in_start": 6, "in_len": 1, "out_start": 4, "out_len": 1}, 
-                               {"in_start": 9, "in_len": 0, "out_start": 7, "out_len": 3}, 
-                               {"in_start": 24, "in_len": 1, "out_start": 25, "out_len": 1}, 
-                              ],
-                    "in": {0: 3, 1: 4, 2: 5, 3: 6, 4: 7, 5: 8, 6: 9, 7: 11, 8: 12, 9: 16, 10: 17, 11: 18,
-                           21: 20, 22: 21, 23: 22, 24: 23, 25: 25},
-                    "out": {0: 3, 1: 4, 2: 7, 3: 8, 4: 10, 5: 11, 6: 12, 7: 13, 8: 14, 9: 15, 10: 16, 11: 17, 12: 18,
-                            22: 20, 23: 21, 24: 22, 25: 24, 26: 25}}
-        self.assertEqual(changed(input), expected)
-
-    def test_parse_git_diff_errors(self):
-        self.assertRaises(ValueError, parse_git_diff, ["asdf"])
-        self.assertRaises(ValueError, parse_git_diff, ["diff --git b/.github/workflows/test.yml a/.github/workflows/test.yml"])
-
-    def test_parse_git_diff_empty(self):
-        self.assertEqual(parse_git_diff(["diff --git a/.github/workflows/test.yml b/.github/workflows/test.yml", "index"]), 
-                                        {".github/workflows/test.yml": { "unidiff": [], 
-                                                                          "new_file": False, 
-                                                                          "deleted": False, 
-                                                                          "renamed": False }})
-
-    def test_parse_git_diff_small(self):
-        self.assertEqual(parse_git_diff([]), {})
-
-    def test_parse_git_diff(self):
-        input = [
-            "diff --git a/.github/workflows/test.yml b/.github/workflows/test.yml",
-            "index cb179e3..066ddb8 100644",
-            "--- a/.github/workflows/test.yml",
-            "+++ b/.github/workflows/test.yml",
-            "@@ -15,8 +15,11 @@ jobs:",
-            "           echo $GITHUB_WORKSPACE",
-            "           echo {{ github.repository }}",
-            "           echo hell0 world",
-            "+",
-            "+          # unit tests",
-            "           python3 addition.py",
-            "           python3 changed.py",
-            "+",
-            "           docker image ls",
-            "           clang-format --version",
-            "           echo $GITHUB_SHA",
-            "diff --git a/changed.py b/changed.py",
-            "index 1b906cf..3a26bdb 100644",
-            "--- a/changed.py",
-            "+++ b/changed.py",
-            "@@ -3,6 +3,11 @@ import re",
-            " import subprocess",
-            "",
-            "",
-            "+def parse_git_diff(git_diff):",
-            "+    pass",
-            "+",
-            "+",
-            " def run(command, valid_return_codes=[0], ignore_return=False):",
-            "     r = subprocess.run(command, capture_output=True)",
-            "     if not ignore_return and r.returncode not in valid_return_codes:",
-            "@@ -148,6 +153,14 @@ class TestChanged(unittest.TestCase):",
-            "                               ]}",
-            "         self.assertEqual(changed(input), expected)",
-            "",
-            "+    def test_parse_git_diff(self):",
-            "+        input = [",
-            "+",
-            "+        ]",
-            "+        actual = parse_git_diff(input)",
-            "+        expected = {}",
-            "+        self.assertEqual(actual, expected)",
-            "+",
-            "",
-            " if __name__ == '__main__':",
-            "     unittest.main()",
-            "diff --git a/changed_check_style.py b/changed_check_style.py",
-            "index d755c97..4f9fe22 100644",
-            "--- a/changed_check_style.py",
-            "+++ b/changed_check_style.py",
-            "@@ -3,11 +3,14 @@ import changed",
-            "     changes_unidiff = changed.diff(base, changes)",
-            "",
-            "-    changes_diff_data = changed.changed(changes_unidiff)",
-            "+    changes_diff_data =  changed.changed(changes_unidiff)",
-            "     style_diff_data = changed.changed(style_unidiff)",
-        ]
-        actual = parse_git_diff(input)
-        expected = {".github/workflows/test.yml": { "unidiff": [
-                                                        "--- a/.github/workflows/test.yml",
-                                                        "+++ b/.github/workflows/test.yml",
-                                                        "@@ -15,8 +15,11 @@ jobs:",
-                                                        "           echo $GITHUB_WORKSPACE",
-                                                        "           echo {{ github.repository }}",
-                                                        "           echo hell0 world",
-                                                        "+",
-                                                        "+          # unit tests",
-                                                        "           python3 addition.py",
-                                                        "           python3 changed.py",
-                                                        "+",
-                                                        "           docker image ls",
-                                                        "           clang-format --version",
-                                                        "           echo $GITHUB_SHA" ], 
-                                                    "new_file": False, 
-                                                    "deleted": False, 
-                                                    "renamed": False },
-                    "changed.py": { "unidiff": [
-                                        "--- a/changed.py",
-                                        "+++ b/changed.py",
-                                        "@@ -3,6 +3,11 @@ import re",
-                                        " import subprocess",
-                                        "",
-                                        "",
-                                        "+def parse_git_diff(git_diff):",
-                                        "+    pass",
-                                        "+",
-                                        "+",
-                                        " def run(command, valid_return_codes=[0], ignore_return=False):",
-                                        "     r = subprocess.run(command, capture_output=True)",
-                                        "     if not ignore_return and r.returncode not in valid_return_codes:",
-                                        "@@ -148,6 +153,14 @@ class TestChanged(unittest.TestCase):",
-                                        "                               ]}",
-                                        "         self.assertEqual(changed(input), expected)",
-                                        "",
-                                        "+    def test_parse_git_diff(self):",
-                                        "+        input = [",
-                                        "+",
-                                        "+        ]",
-                                        "+        actual = parse_git_diff(input)",
-                                        "+        expected = {}",
-                                        "+        self.assertEqual(actual, expected)",
-                                        "+",
-                                        "",
-                                        " if __name__ == '__main__':",
-                                        "     unittest.main()" ], 
-                                    "new_file": False, 
-                                    "deleted": False, 
-                                    "renamed": False },
-                    "changed_check_style.py": { "unidiff": [
-                                    "--- a/changed_check_style.py",
-                                    "+++ b/changed_check_style.py",
-                                    "@@ -3,11 +3,14 @@ import changed",
-                                    "     changes_unidiff = changed.diff(base, changes)",
-                                    "",
-                                    "-    changes_diff_data = changed.changed(changes_unidiff)",
-                                    "+    changes_diff_data =  changed.changed(changes_unidiff)",
-                                    "     style_diff_data = changed.changed(style_unidiff)" ], 
-                                                "new_file": False, 
-                                                "deleted": False, 
-                                                "renamed": False }
-        }
-
-        self.assertEqual(actual, expected)
-
-    def test_parse_git_diff_with_changed_files(self):
-        input = [
-            "diff --git a/wrongfully_formatted-b.cpp b/wrongfully_formatted-b.cpp",
-            "new file mode 100644",
-            "index 0000000..e69de29",
-            "diff --git a/wrongfully_formatted-a.cpp b/wrongfully_formatted-c.cpp",
-            "similarity index 100%",
-            "rename from wrongfully_formatted-a.cpp",
-            "rename to wrongfully_formatted-c.cpp",
-            "diff --git a/wrongfully_formatted-d.cpp b/wrongfully_formatted-d.cpp",
-            "deleted file mode 100644",
-            "index af5846b..0000000",
-            "--- a/wrongfully_formatted-d.cpp",
-            "+++ /dev/null",
-            "@@ -1,12 +0,0 @@",
-            "-#include <iostream>",
-            "-",
-            "-class A",
-            "-{",
-            "-public:",
-            "-    A(){}",
-            "-};",
-            "-",
-            "-int main()",
-            "-{",
-            "-    return 1;",
-            "-}"
-        ]
-        actual = parse_git_diff(input)
-        expected = {"wrongfully_formatted-b.cpp": { "unidiff": [], 
-                                                    "new_file": True, 
-                                                    "deleted": False, 
-                                                    "renamed": False },
-                    "wrongfully_formatted-d.cpp": { "unidiff": [
-                                                    "--- a/wrongfully_formatted-d.cpp",
-                                                    "+++ /dev/null",
-                                                    "@@ -1,12 +0,0 @@",
-                                                    "-#include <iostream>",
-                                                    "-",
-                                                    "-class A",
-                                                    "-{",
-                                                    "-public:",
-                                                    "-    A(){}",
-                                                    "-};",
-                                                    "-",
-                                                    "-int main()",
-                                                    "-{",
-                                                    "-    return 1;",
-                                                    "-}" ], 
-                                                "new_file": False, 
-                                                "deleted": True, 
-                                                "renamed": False }
-        }
-
-        self.assertEqual(actual, expected)
-
-
-if __name__ == '__main__':
-    unittest.main()
+def line_ranges(lines):
+    """Merges line numbers (iterable of ints) into sorted list of ranges of consecutive lines.
+    Each range is a tuple: first line, one-past-last line."""
+
+    ranges = []
+    for line in sorted(set(lines)):
+        if ranges and ranges[-1][1] == line:
+            ranges[-1] = (ranges[-1][0], line + 1)
+        else:
+            ranges.append((line, line + 1))
+    return ranges
+
@@ -3,5 +3,30 @@
 export PATH=$PATH:/style_police
 export PYTHONPATH=/style_police
 
+REVIEW=
+if [ "${2}" = "true" ]
+then
+    REVIEW=--review
+fi
+
+STATS=
+if [ "${3}" = "true" ]
+then
+    STATS="--stats github"
+fi
+
+BASE=
+if [ "${4}" = "true" ]
+then
+    BASE="--base origin/${GITHUB_BASE_REF}"
+fi
+
+if [ -n "${5}" ]
+then
+    export STYLE_POLICE_CACHE_DIR="${5}"
+fi
+
 cd /github/workspace
-python3 /style_police/check_commit_style.py ${1}
+# run by script path, so that sys.path starts with /style_police and not with the checked repository,
+# modules it imports still use their precompiled bytecode
+exec python3 /style_police/check_commit_style.py ${REVIEW} ${STATS} ${BASE} ${1}
@@ -0,0 +1,131 @@
+import diff_util
+import os
+
+
+# thresholds of "guard" configuration, every one of them can be overridden in style_config.yaml
+DEFAULT_THRESHOLDS = {"max_blob_size": 1024 * 1024,  # bytes
+                      "max_changed_lines": 20000,  # added and deleted lines, from git numstat
+                      "sample_size": 8192,  # bytes from the beginning of a file sampled for the checks below
+                      "max_average_line_length": 200,  # longer lines in the sample mean minified or generated file
+                      "generated_markers": ["@generated", "DO NOT EDIT"]}
+
+
+def changed_line_counts(base, revision=None):
+    """Returns dict: path -> (added, deleted) lines changed since base, from "git diff --numstat",
+    of working tree or of revision. Counts are None for binary files."""
+
+    command = ["git", "diff", "--numstat", "-z", base] + ([revision] if revision is not None else [])
+    fields = diff_util.run(command).split("\0")
+
+    counts = {}
+    i = 0
+    while i < len(fields) and fields[i]:
+        added, deleted, path = fields[i].split("\t", 2)
+        i += 1
+        if not path:
+            # renamed file: empty path is followed by old and new paths
+            path = fields[i + 1]
+            i += 2
+        counts[path] = None if added == "-" else (int(added), int(deleted))
+    return counts
+
+
+def blob_sizes(revision, paths):
+    """Returns dict: path -> size of the file at revision, from a single "git cat-file --batch-check",
+    paths missing at revision are left out."""
+
+    if not paths:
+        return {}
+
+    requests = "".join("{}:{}\n".format(revision, path) for path in paths).encode()
+    output = diff_util.run(["git", "cat-file", "--batch-check"], input=requests)
+
+    sizes = {}
+    for path, line in zip(paths, output.splitlines()):
+        fields = line.split()
+        if fields[-1] != "missing" and fields[-1] != "ambiguous" and fields[1] == "blob":
+            sizes[path] = int(fields[2])
+    return sizes
+
+
+def generated_attributes(paths):
+    """Returns set of paths marked linguist-generated in .gitattributes, from a single "git check-attr"."""
+
+    if not paths:
+        return set()
+
+    output = diff_util.run(["git", "check-attr", "-z", "--stdin", "linguist-generated"],
+                           input="".join(path + "\0" for path in paths).encode())
+    fields = output.split("\0")
+    return { fields[i] for i in range(0, len(fields) - 2, 3) if fields[i + 2] in ("set", "true") }
+
+
+def sample_reason(sample, thresholds=DEFAULT_THRESHOLDS):
+    """Returns why a file looks generated judging by sample of its beginning (bytes), or None."""
+
+    for marker in thresholds["generated_markers"]:
+        if marker.encode() in sample:
+            return "generated: {} marker".format(marker)
+
+    lines = sample.split(b"\n")
+    if len(lines) > 1 and (not lines[-1] or len(sample) >= thresholds["sample_size"]):
+        # the last line is either empty after the last line end or cut by the sample
+        lines.pop()
+    average = sum(len(line) for line in lines) / len(lines)
+    if average > thresholds["max_average_line_length"]:
+        return "generated: average line length {:.0f}".format(average)
+
+    return None
+
+
+def guard(base, revision=None, accept=None, thresholds=DEFAULT_THRESHOLDS, max_size=None):
+    """Classifies files changed since base (in working tree or revision) as generated or oversized
+    before their diff is parsed or stylers are started, using git numstat, file sizes,
+    .gitattributes linguist-generated and a sample of content. Only files accept accepts are checked.
+    If max_size is given, it's called with path and returns a lower size limit of the file (e.g. "max_file_size"
+    of its style class) or None. Sizes are known before any content is read, so oversized files are never read.
+    Returns (reasons, contents): reasons is dict: path -> reason, e.g. "oversized: 2000000 bytes";
+    contents is dict: path -> content (bytes) of files read from revision to be sampled, so that they
+    don't need to be read again, None for working tree."""
+
+    counts = changed_line_counts(base, revision)
+    paths = [ path for path in counts if accept is None or accept(path) ]
+
+    reasons = {}
+    for path in generated_attributes(paths):
+        reasons[path] = "generated: linguist-generated"
+
+    for path in paths:
+        if path not in reasons and counts[path] is not None and sum(counts[path]) > thresholds["max_changed_lines"]:
+            reasons[path] = "oversized: {} changed lines".format(sum(counts[path]))
+
+    if revision is not None:
+        sizes = blob_sizes(revision, [ path for path in paths if path not in reasons ])
+    else:
+        sizes = { path: os.path.getsize(path) for path in paths if path not in reasons and os.path.isfile(path) }
+    for path in sizes:
+        limit = thresholds["max_blob_size"]
+        if max_size is not None and max_size(path) is not None:
+            limit = min(limit, max_size(path))
+        if sizes[path] > limit:
+            reasons[path] = "oversized: {} bytes".format(sizes[path])
+
+    sampled = [ path for path in sizes if path not in reasons ]
+    contents = None
+    if revision is not None:
+        contents = diff_util.read_blobs(revision, sampled)
+        samples = { path: contents[path][:thresholds["sample_size"]] for path in contents }
+    else:
+        samples = {}
+        for path in sampled:
+            with open(path, "rb") as sample_file:
+                samples[path] = sample_file.read(thresholds["sample_size"])
+
+    for path in samples:
+        reason = sample_reason(samples[path], thresholds)
+        if reason is not None:
+            reasons[path] = reason
+            if contents is not None:
+                del contents[path]
+
+    return reasons, contents
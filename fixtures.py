@@ -0,0 +1,108 @@
+import http.server
+import json
+import os
+import subprocess
+import threading
+
+
+class Repository:
+    """Git repository for tests and benchmarks, initialized in existing directory.
+    Commits are made with a fixed test identity, so they don't depend on git configuration of the machine."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.git("init", "-q")
+
+    def git(self, *arguments):
+        """Runs git command in the repository, returns its output without trailing whitespace."""
+        return subprocess.run(["git", "-C", self.directory, "-c", "user.name=test", "-c", "user.email=test@localhost"] + list(arguments),
+                              check=True, capture_output=True).stdout.decode().strip()
+
+    def write(self, files):
+        """Writes files, dict: path in the repository -> content (str or bytes)."""
+
+        for path in files:
+            content = files[path]
+            with open(os.path.join(self.directory, path), "wb" if isinstance(content, bytes) else "w") as source_file:
+                source_file.write(content)
+
+    def commit(self, message, files={}):
+        """Writes files (see write), commits all changes of the working tree, returns hash of the commit."""
+
+        self.write(files)
+        self.git("add", "-A")
+        self.git("commit", "-qm", message)
+        return self.git("rev-parse", "HEAD")
+
+
+class Environment:
+    """Saves os.environ when created and sets variables (None removes a variable),
+    restore (or the end of with block) brings back the saved environment."""
+
+    def __init__(self, variables={}):
+        self.previous = dict(os.environ)
+        for name in variables:
+            if variables[name] is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = variables[name]
+
+    def restore(self):
+        os.environ.clear()
+        os.environ.update(self.previous)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.restore()
+
+
+class StubGitHubServer:
+    """Local HTTP server standing in for GitHub API, served from a background thread until stop (or the end of with block).
+    POST requests are recorded in requests as (path, Authorization header, JSON body, client address) and answered
+    with (status, headers) taken from responses, 201 when it's empty. Status None breaks the connection after
+    the request is handled, without a response. If close_after_response is set, keep-alive connections are closed
+    after every response without telling the client."""
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        self.close_after_response = False
+        stub = self
+
+        class StubHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests.append((self.path, self.headers["Authorization"], json.loads(body), self.client_address))
+                status, headers = stub.responses.pop(0) if stub.responses else (201, {})
+                if status is None:
+                    self.close_connection = True
+                    return
+                self.close_connection = stub.close_after_response
+                response = b'{"id": 1}'
+                self.send_response(status)
+                for name in headers:
+                    self.send_header(name, headers[name])
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:{port}".format(port=self.server.server_port)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.stop()
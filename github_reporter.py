@@ -0,0 +1,212 @@
+import concurrent.futures
+import http.client
+import json
+import os
+import queue
+import re
+import select
+import threading
+import time
+import urllib.parse
+
+
+def pull_request_event():
+    """Returns "pull_request" object of the event payload the workflow runs for, or None."""
+
+    event_path = os.environ.get("GITHUB_EVENT_PATH")
+    if event_path and os.path.isfile(event_path):
+        with open(event_path) as event_file:
+            event = json.load(event_file)
+        if type(event.get("pull_request")) is dict:
+            return event["pull_request"]
+
+    return None
+
+
+def pull_request_number():
+    """Returns number of the pull request the workflow runs for, or None.
+    Looks into the event payload first, then into GITHUB_REF (refs/pull/N/merge)."""
+
+    pull_request = pull_request_event()
+    if pull_request is not None and "number" in pull_request:
+        return pull_request["number"]
+
+    match = re.fullmatch("refs/pull/(\\d+)/(merge|head)", os.environ.get("GITHUB_REF", ""))
+    if match is not None:
+        return int(match.groups()[0])
+
+    return None
+
+
+def pull_request_head():
+    """Returns SHA of the head commit of the pull request the workflow runs for, or None.
+    On pull_request events GITHUB_SHA is a merge commit that isn't part of the pull request,
+    so the head commit is what has to be checked and reviewed."""
+
+    pull_request = pull_request_event()
+    if pull_request is not None and type(pull_request.get("head")) is dict:
+        return pull_request["head"].get("sha")
+
+    return None
+
+
+# requests that can be sent again if the connection breaks after they were sent, their effect is the same
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+
+class GitHubReporter:
+    """Posts style suggestions through GitHub REST API.
+    Every worker thread keeps one keep-alive connection to the API host and reuses it
+    for all of its requests. Requests rejected by rate limiting (429, or 403 with
+    rate limit headers) are retried with exponential backoff, honoring Retry-After.
+    Requests are sent again on a new connection if it breaks before they are sent in full,
+    after that only idempotent ones are."""
+
+    def __init__(self, token, repository, sha, api_url="https://api.github.com", jobs=4, max_retries=5, backoff=1.0):
+        self.token = token
+        self.repository = repository
+        self.sha = sha
+        self.jobs = jobs
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = time.sleep
+
+        url = urllib.parse.urlsplit(api_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError("Unsupported GitHub API URL: {url}".format(url=api_url))
+        self.connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.host = url.netloc
+        self.path_prefix = url.path.rstrip("/")
+        self.local = threading.local()
+
+    @classmethod
+    def from_environment(cls, token, sha=None, **kwargs):
+        """Creates reporter for the repository of the current GitHub Actions run,
+        posting on commit sha, GITHUB_SHA by default."""
+        return cls(token, os.environ["GITHUB_REPOSITORY"], sha if sha is not None else os.environ["GITHUB_SHA"],
+                   api_url=os.environ.get("GITHUB_API_URL", "https://api.github.com"), **kwargs)
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None and connection.sock is not None and select.select([connection.sock], [], [], 0)[0]:
+            # idle keep-alive connection is readable only if the server closed it, don't send on it
+            self.close()
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = self.connection_class(self.host, timeout=60)
+        return self.local.connection
+
+    def close(self):
+        if getattr(self.local, "connection", None) is not None:
+            self.local.connection.close()
+            self.local.connection = None
+
+    def retry_delay(self, response, attempt):
+        """Returns seconds to wait before retrying response, or None if it should not be retried."""
+
+        rate_limited = response.status == 429 or (response.status == 403 and
+                       (response.getheader("retry-after") is not None or response.getheader("x-ratelimit-remaining") == "0"))
+        if not rate_limited or attempt >= self.max_retries:
+            return None
+
+        if response.getheader("retry-after") is not None:
+            return float(response.getheader("retry-after"))
+
+        if response.getheader("x-ratelimit-reset") is not None:
+            return max(0.0, float(response.getheader("x-ratelimit-reset")) - time.time())
+
+        return self.backoff * 2 ** attempt
+
+    def request(self, method, path, payload):
+        """Sends one API request and returns decoded JSON response."""
+
+        body = json.dumps(payload)
+        headers = {"Accept": "application/vnd.github+json",
+                   "Authorization": "Bearer {token}".format(token=self.token),
+                   "X-GitHub-Api-Version": "2022-11-28",
+                   "Content-Type": "application/json"}
+
+        attempt = 0
+        while True:
+            sent = False
+            try:
+                connection = self.connection()
+                connection.request(method, self.path_prefix + path, body, headers)
+                sent = True
+                response = connection.getresponse()
+                response_body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # connection closed by the server, reconnect, but the server may have handled a request
+                # that was sent in full, so only idempotent requests are sent again then (e.g. no duplicate comments)
+                self.close()
+                if attempt >= self.max_retries or (sent and method not in IDEMPOTENT_METHODS):
+                    raise
+                attempt += 1
+                continue
+
+            if response.getheader("connection", "").lower() == "close":
+                self.close()
+
+            if 200 <= response.status < 300:
+                return json.loads(response_body) if response_body else None
+
+            delay = self.retry_delay(response, attempt)
+            if delay is None:
+                raise RuntimeError("GitHub API request {method} {path} returned {status}: {body}".format(
+                    method=method, path=path, status=response.status, body=response_body.decode(errors="replace")))
+
+            self.sleep(delay)
+            attempt += 1
+
+    def post_commit_comment(self, comment):
+        """Posts one commit comment. comment is dict with "path", "position" and "body"."""
+        return self.request("POST", "/repos/{repository}/commits/{sha}/comments".format(
+                            repository=self.repository, sha=self.sha), comment)
+
+    def post_commit_comments(self, comments):
+        """Posts commit comments concurrently. Comments are queued and taken by up to
+        self.jobs workers, each of them reusing its own connection.
+        Returns list of responses in the order of comments."""
+
+        results = [None] * len(comments)
+        pending = queue.Queue()
+        for item in enumerate(comments):
+            pending.put(item)
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        index, comment = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    results[index] = self.post_commit_comment(comment)
+            finally:
+                self.close()
+
+        workers = min(self.jobs, len(comments))
+        if workers <= 1:
+            worker()
+            return results
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+
+        return results
+
+    def review_payload(self, comments, body="Style check found formatting suggestions."):
+        """Returns request payload of a pull request review with comments, positioned on commit self.sha."""
+        return {"commit_id": self.sha, "body": body, "event": "COMMENT", "comments": comments}
+
+    def post_review(self, pull_number, comments, body="Style check found formatting suggestions."):
+        """Posts all comments as a single pull request review."""
+
+        if not comments:
+            return None
+
+        try:
+            return self.request("POST", "/repos/{repository}/pulls/{pull_number}/reviews".format(
+                                repository=self.repository, pull_number=pull_number),
+                                self.review_payload(comments, body))
+        finally:
+            self.close()
@@ -0,0 +1,157 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+_lock = threading.Lock()
+_stages = {}
+_files = {}
+_subprocesses = {}
+_bytes_read = {}
+_counters = {}
+_profile = {}
+
+
+def reset():
+    """Forgets everything recorded so far."""
+
+    with _lock:
+        for data in (_stages, _files, _subprocesses, _bytes_read, _counters, _profile):
+            data.clear()
+
+
+def _add(data, key, values):
+    with _lock:
+        entry = data.setdefault(key, dict.fromkeys(values, 0))
+        for name in values:
+            entry[name] += values[name]
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Records wall-clock and process CPU time spent in the with block as stage name.
+    Time of a stage entered several times is summed."""
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        _add(_stages, name, {"count": 1, "wall_seconds": time.perf_counter() - wall_start,
+                             "cpu_seconds": time.process_time() - cpu_start})
+
+
+@contextlib.contextmanager
+def file_timer(file):
+    """Records wall-clock and CPU time of the current thread spent in the with block on file."""
+
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        _add(_files, file, {"wall_seconds": time.perf_counter() - wall_start,
+                            "cpu_seconds": time.thread_time() - cpu_start})
+
+
+def record_subprocess(command, seconds, output_bytes):
+    """Records one finished subprocess, grouped by its executable."""
+    _add(_subprocesses, os.path.basename(command[0]), {"count": 1, "seconds": seconds, "output_bytes": output_bytes})
+
+
+def record_bytes_read(source, count):
+    """Records bytes read from source (e.g. "files")."""
+    _add(_bytes_read, source, {"bytes": count})
+
+
+def count(name, increment=1):
+    """Increments counter name (e.g. number of skipped files)."""
+    _add(_counters, name, {"count": increment})
+
+
+@contextlib.contextmanager
+def profile(kind, top=25):
+    """Profiles the with block with "cprofile" or "tracemalloc", adds top entries to the report.
+    kind None does nothing."""
+
+    if kind is None:
+        yield
+        return
+
+    # profilers are imported only when asked for, to keep startup of a normal run short
+    if kind == "cprofile":
+        import cProfile
+        import io
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(top)
+            _profile["cprofile"] = output.getvalue()
+    elif kind == "tracemalloc":
+        import tracemalloc
+
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            _profile["tracemalloc"] = {"peak_bytes": peak,
+                                       "top": [ str(statistic) for statistic in snapshot.statistics("lineno")[:top] ]}
+    else:
+        raise ValueError("Unknown profiler: {kind}".format(kind=kind))
+
+
+def report():
+    """Returns everything recorded as a JSON-serializable dict."""
+
+    with _lock:
+        return json.loads(json.dumps({"stages": _stages, "files": _files, "subprocesses": _subprocesses,
+                                      "bytes_read": _bytes_read, "counters": _counters, "profile": _profile}))
+
+
+def step_summary(data):
+    """Returns report data formatted as GitHub step summary markdown."""
+
+    lines = ["## Style check timings", "", "| stage | count | wall, s | CPU, s |", "| --- | ---: | ---: | ---: |"]
+    for name, entry in data["stages"].items():
+        lines.append("| {} | {} | {:.3f} | {:.3f} |".format(name, entry["count"], entry["wall_seconds"], entry["cpu_seconds"]))
+
+    lines += ["", "| subprocess | count | wall, s | output bytes |", "| --- | ---: | ---: | ---: |"]
+    for name, entry in data["subprocesses"].items():
+        lines.append("| {} | {} | {:.3f} | {} |".format(name, entry["count"], entry["seconds"], entry["output_bytes"]))
+
+    if data["counters"]:
+        lines += ["", "| counter | count |", "| --- | ---: |"]
+        for name, entry in data["counters"].items():
+            lines.append("| {} | {} |".format(name, entry["count"]))
+
+    slowest = sorted(data["files"].items(), key=lambda item: -item[1]["wall_seconds"])[:10]
+    if slowest:
+        lines += ["", "| slowest files | wall, s | CPU, s |", "| --- | ---: | ---: |"]
+        for name, entry in slowest:
+            lines.append("| {} | {:.3f} | {:.3f} |".format(name, entry["wall_seconds"], entry["cpu_seconds"]))
+
+    if "cprofile" in data["profile"]:
+        lines += ["", "```", data["profile"]["cprofile"].strip(), "```"]
+
+    return "\n".join(lines) + "\n"
+
+
+def write_report(path):
+    """Writes JSON report to path. Path "github" appends step summary to $GITHUB_STEP_SUMMARY instead."""
+
+    data = report()
+    if path == "github":
+        with open(os.environ["GITHUB_STEP_SUMMARY"], "a") as summary_file:
+            summary_file.write(step_summary(data))
+    else:
+        with open(path, "w") as report_file:
+            json.dump(data, report_file, indent=2)
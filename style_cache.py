@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+def blob_hash(content):
+    """Returns git blob hash of content (bytes), same as "git hash-object" would."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def config_hash(style):
+    """Returns hash of style class configuration (dict)."""
+    return hashlib.sha256(json.dumps(style, sort_keys=True).encode()).hexdigest()
+
+
+class StyleCache:
+    """Persistent content-addressed cache of styler output.
+    Entries are files in directory, named by hash of (file blob hash, styler identity
+    (command or Python styler and its version), style configuration hash). Entry modification time is its last use,
+    evict() removes least recently used entries until total size fits into max_size bytes."""
+
+    def __init__(self, directory, max_size=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, content, styler_identity, style, arguments=[]):
+        """Returns cache key of styling content with styler of style class,
+        styler_identity is what styler backend identity() returns,
+        arguments are extra styler arguments (e.g. line ranges)."""
+        key_data = json.dumps([blob_hash(content), styler_identity, arguments, config_hash(style)])
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """Returns cached styler output (bytes) or None."""
+
+        try:
+            with open(self.path(key), "rb") as entry:
+                styled = entry.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            pass
+
+        return styled
+
+    def put(self, key, styled):
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(file_descriptor, "wb") as entry:
+            entry.write(styled)
+        os.replace(temporary_path, self.path(key))
+
+    def evict(self):
+        """Removes least recently used entries while cache is bigger than max_size."""
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith(".tmp-"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            os.remove(path)
+            total_size -= size
@@ -0,0 +1,58 @@
+import fnmatch
+import re
+
+
+def compile_globs(patterns):
+    """Returns one compiled regular expression matching any of glob patterns, or None if there are none.
+    Patterns are fnmatch globs matched against the whole path, "*" also matches "/"."""
+
+    if not patterns:
+        return None
+    return re.compile("|".join("(?:{})".format(fnmatch.translate(pattern)) for pattern in patterns))
+
+
+class StyleDispatcher:
+    """Resolves file paths to exactly one style class.
+    Style class is chosen by the longest configured suffix the path ends with,
+    then by "globs" patterns of style classes in configuration order.
+    Paths matching top-level exclude patterns or "exclude" patterns of the chosen style class
+    have no style class."""
+
+    def __init__(self, style_config, exclude=[]):
+        self.suffixes = {}
+        for style_class in style_config:
+            for suffix in style_config[style_class]["suffixes"]:
+                self.suffixes.setdefault(suffix, style_class)
+        self.suffix_lengths = sorted({ len(suffix) for suffix in self.suffixes }, reverse=True)
+
+        self.globs = [ (style_class, compile_globs(style_config[style_class].get("globs", [])))
+                       for style_class in style_config if style_config[style_class].get("globs") ]
+        self.class_exclude = { style_class: compile_globs(style_config[style_class].get("exclude", []))
+                               for style_class in style_config }
+        self.exclude = compile_globs(exclude)
+
+    def resolve(self, path):
+        """Returns style class of path or None."""
+
+        if self.exclude is not None and self.exclude.match(path):
+            return None
+
+        style_class = None
+        for length in self.suffix_lengths:
+            if length <= len(path) and path[len(path) - length:] in self.suffixes:
+                style_class = self.suffixes[path[len(path) - length:]]
+                break
+
+        if style_class is None:
+            for glob_class, pattern in self.globs:
+                if pattern.match(path):
+                    style_class = glob_class
+                    break
+
+        if style_class is None:
+            return None
+
+        if self.class_exclude[style_class] is not None and self.class_exclude[style_class].match(path):
+            return None
+
+        return style_class
@@ -0,0 +1,157 @@
+import diff_util
+import concurrent.futures
+import importlib
+import multiprocessing
+import threading
+
+
+def _black(source, path):
+    import black
+    return black.format_str(source, mode=black.Mode())
+
+
+def _yapf(source, path):
+    from yapf.yapflib import yapf_api
+    return yapf_api.FormatCode(source, filename=path)[0]
+
+
+def _autopep8(source, path):
+    import autopep8
+    return autopep8.fix_code(source)
+
+
+# built-in Python stylers, name: (module reporting version, function(source, path) returning styled source)
+PYTHON_STYLERS = {"black": ("black", _black),
+                  "yapf": ("yapf", _yapf),
+                  "autopep8": ("autopep8", _autopep8)}
+
+
+def load_python_styler(name):
+    """Returns (styler function, version) for a built-in Python styler name or "module:function".
+    Styler function accepts source (str) and file path, returns styled source."""
+
+    if name in PYTHON_STYLERS:
+        module_name, function = PYTHON_STYLERS[name]
+    elif ":" in name:
+        module_name, function_name = name.split(":", 1)
+        function = None
+    else:
+        raise RuntimeError("Unknown Python styler: {name}".format(name=name))
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        raise RuntimeError("Python styler {name} is not installed.".format(name=name))
+
+    if function is None:
+        function = getattr(module, function_name)
+
+    return function, str(getattr(module, "__version__", ""))
+
+
+_formatter_versions = {}
+_formatter_versions_lock = threading.Lock()
+
+
+def formatter_version(styler):
+    """Returns version string reported by styler executable, queried once per process."""
+
+    executable = styler[0]
+    with _formatter_versions_lock:
+        if executable not in _formatter_versions:
+            try:
+                _formatter_versions[executable] = diff_util.run([executable, "--version"], ignore_return=True).strip()
+            except OSError:
+                _formatter_versions[executable] = ""
+        return _formatter_versions[executable]
+
+
+# style class limits of styler subprocesses
+LIMITS = ("timeout", "cpu_limit", "memory_limit")
+
+
+class SubprocessBackend:
+    """Runs styler command of the style class for every file.
+    If style class has "stdin_argument" (e.g. "--assume-filename={path}" for clang-format),
+    file content is piped to styler's stdin instead of passing file path,
+    so that the file doesn't have to be in the working tree.
+    Styler is run with "timeout", "cpu_limit" and "memory_limit" of the style class (see diff_util.run)."""
+
+    def __init__(self, style, jobs=1):
+        self.command = style["styler_command"]
+        self.stdin_argument = style.get("stdin_argument")
+        self.limits = { name: style[name] for name in LIMITS if name in style }
+        self.reads_content = self.stdin_argument is not None
+
+    def identity(self):
+        """Returns list identifying styler and its version, used in cache keys."""
+        return self.command + [formatter_version(self.command)]
+
+    def style(self, file, content, arguments=[]):
+        """Returns styled file (bytes), content is current content of the file (bytes),
+        arguments are extra styler arguments (e.g. line ranges)."""
+        if self.stdin_argument is not None:
+            return diff_util.run(self.command + arguments + [self.stdin_argument.format(path=file)], input=content, decode=False,
+                                 limits=self.limits)
+        return diff_util.run(self.command + arguments + [file], decode=False, limits=self.limits)
+
+    def close(self):
+        pass
+
+
+class PythonBackend:
+    """Imports Python styler once and calls it in-process for every file."""
+
+    reads_content = True
+
+    def __init__(self, style, jobs=1):
+        self.name = style["python_styler"]
+        self.function, self.version = load_python_styler(self.name)
+
+    def identity(self):
+        return ["python", self.name, self.version]
+
+    def style(self, file, content, arguments=[]):
+        return self.function(content.decode(), file).encode()
+
+    def close(self):
+        pass
+
+
+_worker_styler = None
+
+
+def _initialize_worker(name):
+    global _worker_styler
+    _worker_styler = load_python_styler(name)[0]
+
+
+def _style_in_worker(source, file):
+    return _worker_styler(source, file)
+
+
+class WorkerPoolBackend(PythonBackend):
+    """Keeps a pool of jobs worker processes, each of them imports Python styler once.
+    Styling a file is an IPC round-trip, and stylers run in parallel without sharing the GIL.
+    Workers are started from a fork server, they are started on demand from threads checking files,
+    and forking a process with other threads running could copy locks they hold."""
+
+    def __init__(self, style, jobs=1):
+        super().__init__(style, jobs)
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("forkserver"),
+                                                               initializer=_initialize_worker, initargs=(self.name,))
+
+    def style(self, file, content, arguments=[]):
+        return self.executor.submit(_style_in_worker, content.decode(), file).result().encode()
+
+    def close(self):
+        self.executor.shutdown()
+
+
+BACKENDS = {"subprocess": SubprocessBackend, "python": PythonBackend, "worker": WorkerPoolBackend}
+
+
+def create(style, jobs=1):
+    """Creates styler backend for style class configuration, "backend" key selects it,
+    default is "subprocess"."""
+    return BACKENDS[style.get("backend", "subprocess")](style, jobs)
@@ -0,0 +1,91 @@
+import style_cache
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class SuggestionLedger:
+    """Persistent record of computed and reported style suggestions, stored as a JSON file.
+    Suggestions are recorded per (path, file blob hash, style configuration hash, file diff hash,
+    styler identity), so a file that didn't change since the previous run (e.g. after force-push)
+    doesn't need its styler to run again, while a styler upgrade does restyle it.
+    Reported comments are recorded by (target, path, position, body), target is where they were posted
+    (e.g. pull request or commit), so the same comment isn't posted there twice.
+    At most max_entries least recently used suggestion entries and reported comments are kept."""
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.files = {}
+        # comment key -> time it was reported
+        self.reported = {}
+
+        if os.path.isfile(path):
+            with open(path) as ledger_file:
+                data = json.load(ledger_file)
+            self.files = data.get("files", {})
+            self.reported = data.get("reported", {})
+
+    @staticmethod
+    def key(path, content, style, diff, identity):
+        """identity is styler identity (backend identity()), including its version."""
+        key_data = json.dumps([path, style_cache.blob_hash(content), style_cache.config_hash(style),
+                               hashlib.sha256("\n".join(diff).encode()).hexdigest(), identity])
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def get(self, path, content, style, diff, identity):
+        """Returns recorded suggestions, list of (line, styled_suggestion), or None."""
+        return self.lookup(self.key(path, content, style, diff, identity))
+
+    def put(self, path, content, style, diff, identity, suggestions):
+        self.record(self.key(path, content, style, diff, identity), path, suggestions)
+
+    def lookup(self, key):
+        """The same as get, key is the key of get arguments."""
+
+        with self.lock:
+            if key not in self.files:
+                return None
+            self.files[key]["used"] = time.time()
+            return [ tuple(suggestion) for suggestion in self.files[key]["suggestions"] ]
+
+    def record(self, key, path, suggestions):
+        """The same as put, key is the key of put arguments other than suggestions."""
+
+        with self.lock:
+            self.files[key] = {"path": path, "used": time.time(), "suggestions": [ list(suggestion) for suggestion in suggestions ]}
+
+    @staticmethod
+    def comment_key(target, comment):
+        """target identifies where comment is posted, e.g. "pull/7" or "commit/<sha>"."""
+        key_data = json.dumps([target, comment["path"], comment["position"], comment["body"]])
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def is_reported(self, target, comment):
+        with self.lock:
+            return self.comment_key(target, comment) in self.reported
+
+    def mark_reported(self, target, comments):
+        now = time.time()
+        with self.lock:
+            self.reported.update((self.comment_key(target, comment), now) for comment in comments)
+
+    def save(self):
+        with self.lock:
+            if len(self.files) > self.max_entries:
+                newest = sorted(self.files, key=lambda key: self.files[key]["used"], reverse=True)[:self.max_entries]
+                self.files = { key: self.files[key] for key in newest }
+            if len(self.reported) > self.max_entries:
+                newest = sorted(self.reported, key=self.reported.get, reverse=True)[:self.max_entries]
+                self.reported = { key: self.reported[key] for key in newest }
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".ledger-")
+            with os.fdopen(file_descriptor, "w") as ledger_file:
+                json.dump({"files": self.files, "reported": self.reported}, ledger_file)
+            os.replace(temporary_path, self.path)
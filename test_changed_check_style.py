@@ -0,0 +1,95 @@
+from changed_check_style import (changed_intervals, get_next_smaller_larger, line_translation_index,
+                                 overlapping_intervals, style_suggestions, style_suggestions_batch,
+                                 translate_line_numbers_onto_diff_for_github)
+from diff_util import CompactChanged, changed, changed_compact
+import unittest
+
+
+class TestChangedCheckStyle(unittest.TestCase):
+    def test_get_next_smaller_larger(self):
+        self.assertEqual(get_next_smaller_larger(10, []), (None, None))
+        self.assertEqual(get_next_smaller_larger(10, [1, 2, 10, 12, 20, 55, 100]), (2, 12))
+        self.assertEqual(get_next_smaller_larger(11, [1, 2, 10, 12, 20, 55, 100]), (10, 12))
+        self.assertEqual(get_next_smaller_larger(15, [1, 2, 10, 12, 20, 55, 100]), (12, 20))
+        self.assertEqual(get_next_smaller_larger(101, [1, 2, 10, 12, 20, 55, 100]), (100, None))
+        self.assertEqual(get_next_smaller_larger(-11, [1, 2, 10, 12, 20, 55, 100]), (None, 1))
+        self.assertEqual(get_next_smaller_larger(11, [100, 12, 1, 10, 12]), (10, 12))
+        self.assertEqual(get_next_smaller_larger(10, [10]), (None, None))
+
+    def test_translate_line_numbers_with_index(self):
+        map_data = {2: 3, 3: 4, 10: 7, 11: 8}
+        index = line_translation_index(map_data)
+        self.assertEqual(index, [2, 3, 10, 11])
+        for line_number in range(-1, 14):
+            self.assertEqual(translate_line_numbers_onto_diff_for_github(line_number, map_data, True, index),
+                             translate_line_numbers_onto_diff_for_github(line_number, map_data, True))
+        self.assertEqual(translate_line_numbers_onto_diff_for_github(5, map_data, True, index), 5)
+        self.assertEqual(translate_line_numbers_onto_diff_for_github(20, map_data, True, index), 6)
+
+    def test_one(self):
+        a_b_diff = ['--- wrongfully_formatted-a.cpp\t2022-12-15 20:02:47.780977200 +0200', '+++ wrongfully_formatted-b.cpp\t2022-12-15 20:03:35.891497500 +0200', '@@ -8,5 +8,5 @@', ' ', ' int main()', ' {', '-    return 0;', '+    return 1;', ' }']
+        b_style_diff = ['--- wrongfully_formatted-b.cpp\t2022-12-15 20:03:35.891497500 +0200', '+++ -\t2022-12-21 13:18:48.962248900 +0200', '@@ -1,12 +1,8 @@', ' #include <iostream>', ' ', '-class A', '-{', '+class A {', ' public:', '-    A(){}', '+  A() {}', ' };', ' ', '-int main()', '-{', '-    return 1;', '-}', '+int main() { return 1; }']
+        expected = {8: (7, 8)}
+        actual = style_suggestions(a_b_diff, b_style_diff)
+        self.assertEqual(actual, expected)
+
+
+    def test_one_with_line_number_translation(self):
+        a_b_diff = ['--- wrongfully_formatted-a.cpp\t2022-12-15 20:02:47.780977200 +0200', 
+                    '+++ wrongfully_formatted-b.cpp\t2022-12-15 20:03:35.891497500 +0200', 
+                    '@@ -8,5 +8,5 @@', 
+                    ' ', 
+                    ' int main()', 
+                    ' {', 
+                    '-    return 0;', 
+                    '+    return 1;', 
+                    ' }']
+        b_style_diff = ['--- wrongfully_formatted-b.cpp\t2022-12-15 20:03:35.891497500 +0200', 
+                        '+++ -\t2022-12-21 13:18:48.962248900 +0200', 
+                        '@@ -1,12 +1,8 @@', 
+                        ' #include <iostream>', 
+                        ' ', 
+                        '-class A', 
+                        '-{', 
+                        '+class A {', 
+                        ' public:', 
+                        '-    A(){}', 
+                        '+  A() {}', 
+                        ' };', 
+                        ' ', 
+                        '-int main()', 
+                        '-{', 
+                        '-    return 1;', 
+                        '-}', 
+                        '+int main() { return 1; }']
+        expected = {2: (7, 8)}
+        actual = style_suggestions(a_b_diff, b_style_diff, True)
+        self.assertEqual(actual, expected)
+
+
+    def test_overlapping_intervals(self):
+        def blocks(*sides):
+            return CompactChanged([ {"in_start": start, "in_len": length, "out_start": start, "out_len": length} for start, length in sides ])
+
+        a = changed_intervals(blocks((2, 3), (10, 0), (20, 1)), "out")
+        self.assertEqual(list(a[0]), [2, 20])
+        b = changed_intervals(blocks((0, 2), (4, 1), (5, 0), (6, 14), (20, 5)), "in")
+        self.assertEqual(overlapping_intervals(a, b), [1, 4])
+        self.assertEqual(overlapping_intervals(a, changed_intervals(CompactChanged(), "in")), [])
+
+    def test_style_suggestions_batch(self):
+        a_b_diff = ['--- a', '+++ b', '@@ -8,5 +8,5 @@', ' ', ' int main()', ' {', '-    return 0;', '+    return 1;', ' }']
+        b_style_diff = ['--- b', '+++ -', '@@ -1,12 +1,8 @@', ' #include <iostream>', ' ', '-class A', '-{', '+class A {',
+                        ' public:', '-    A(){}', '+  A() {}', ' };', ' ', '-int main()', '-{', '-    return 1;', '-}', '+int main() { return 1; }']
+        no_style_diff = []
+        actual = style_suggestions_batch([("a.cpp", a_b_diff, b_style_diff), ("b.cpp", a_b_diff, no_style_diff),
+                                          ("c.cpp", a_b_diff, b_style_diff)], True)
+        self.assertEqual(actual, [("a.cpp", 2, 7, 8), ("c.cpp", 2, 7, 8)])
+
+        # style diffs may be already parsed
+        for parsed in (changed(b_style_diff), changed_compact(b_style_diff)):
+            self.assertEqual(style_suggestions_batch([("a.cpp", a_b_diff, parsed)], True), [("a.cpp", 2, 7, 8)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+from check_batch import BatchChecker, job_server
+from fixtures import Repository
+import check_commit_style
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+
+STYLE_CONFIG = """style_config:
+  c-like:
+    suffixes: [.cpp]
+    styler_command: [sed, -e, "s/  */ /g"]
+    stdin_argument: -e s|{path}||
+"""
+
+
+class TestCheckBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_cache_dir = check_commit_style.config_cache_dir
+        check_commit_style.config_cache_dir = os.path.join(self.directory.name, "cache")
+        self.repositories = [ self.create_repository(name) for name in ("a", "b") ]
+        self.checker = BatchChecker(jobs=1)
+
+    def tearDown(self):
+        self.checker.close()
+        check_commit_style.config_cache_dir = self.previous_cache_dir
+        self.directory.cleanup()
+
+    def create_repository(self, name):
+        path = os.path.join(self.directory.name, name)
+        os.mkdir(path)
+        repository = Repository(path)
+        repository.commit("base", {"style_config.yaml": STYLE_CONFIG, "main.cpp": "int a;\nint b;\n"})
+        repository.commit("change", {"main.cpp": "int a;\nint  b;\n"})
+        return path
+
+    def test_run(self):
+        jobs = [ json.dumps({"id": index, "repository": repository, "head": "HEAD"}) for index, repository in enumerate(self.repositories) ]
+        jobs += ["", "not json", json.dumps({"id": "missing", "repository": os.path.join(self.directory.name, "missing")})]
+        jobs += ["[1]", "\"x\"", "5"]
+        output = io.StringIO()
+        self.checker.run(jobs, output)
+
+        results = [ json.loads(line) for line in output.getvalue().splitlines() ]
+        self.assertEqual(len(results), 7)
+        for index in range(2):
+            self.assertEqual(results[index]["id"], index)
+            self.assertEqual(results[index]["comments"], [{"path": "main.cpp", "position": 3, "body": "Suggested formatting:\n```\nint b;\n```"}])
+        self.assertIn("Malformed job", results[2]["error"])
+        self.assertEqual(results[3]["id"], "missing")
+        self.assertIn("error", results[3])
+        for result in results[4:]:
+            self.assertIn("not a JSON object", result["error"])
+
+        # repositories with the same style configuration share one styler backend
+        self.assertEqual(len(self.checker.backends), 1)
+
+    def test_socket(self):
+        socket_path = os.path.join(self.directory.name, "jobs.socket")
+        server = job_server(socket_path, self.checker)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            with socket.socket(socket.AF_UNIX) as client:
+                client.connect(socket_path)
+                client.sendall((json.dumps({"id": 1, "repository": self.repositories[0]}) + "\n").encode())
+                client.shutdown(socket.SHUT_WR)
+                result = json.loads(client.makefile().readline())
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.assertEqual(result["id"], 1)
+        self.assertEqual(len(result["comments"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
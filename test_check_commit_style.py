@@ -0,0 +1,349 @@
+from fixtures import Environment, Repository, StubGitHubServer
+import check_commit_style
+import diff_util
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+
+class FakeBackend:
+    """Styler backend collapsing double spaces, files styled first are delayed the most,
+    so that concurrent checks finish out of order. Styling a file named "broken.cpp" fails."""
+
+    reads_content = True
+
+    def __init__(self, delays, version="1.0"):
+        self.delays = delays
+        self.version = version
+        self.threads = set()
+        self.styled = []
+
+    def identity(self):
+        return ["fake", self.version]
+
+    def style(self, file, content, arguments=[]):
+        self.threads.add(threading.get_ident())
+        self.styled.append(file)
+        time.sleep(self.delays.get(file, 0))
+        if file == "broken.cpp":
+            raise ValueError("styler failed")
+        return content.replace(b"  ", b" ")
+
+
+class TestCheckCommitStyle(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_cache_dir = check_commit_style.config_cache_dir
+        check_commit_style.config_cache_dir = os.path.join(self.directory.name, "cache")
+        self.path = os.path.join(self.directory.name, "style_config.yaml")
+
+    def tearDown(self):
+        check_commit_style.config_cache_dir = self.previous_cache_dir
+        self.directory.cleanup()
+
+    def write_configuration(self, text):
+        with open(self.path, "w") as config_file:
+            config_file.write(text)
+
+    def test_read_configuration_cache(self):
+        self.write_configuration("style_config:\n  c-like:\n    suffixes: [.cpp]\n    styler_command: [clang-format]\n")
+        expected = {"style_config": {"c-like": {"suffixes": [".cpp"], "styler_command": ["clang-format"]}}}
+        self.assertEqual(check_commit_style.read_configuration(self.path), expected)
+        self.assertEqual(len(os.listdir(check_commit_style.config_cache_dir)), 1)
+        self.assertEqual(check_commit_style.read_configuration(self.path), expected)
+
+        self.write_configuration("style_config:\n  c-like:\n    suffixes: [.c]\n    styler_command: [clang-format]\n")
+        self.assertEqual(check_commit_style.read_configuration(self.path)["style_config"]["c-like"]["suffixes"], [".c"])
+        self.assertEqual(len(os.listdir(check_commit_style.config_cache_dir)), 2)
+
+    def test_read_configuration_not_cached(self):
+        self.write_configuration("style_config: {}\n1: one\n")
+        self.assertEqual(check_commit_style.read_configuration(self.path), {"style_config": {}, 1: "one"})
+        self.assertFalse(os.path.exists(check_commit_style.config_cache_dir))
+
+    def test_range_arguments(self):
+        style = {"range_argument": "--lines={first}:{last}"}
+        cases = [  # (diff, expected)
+            (["--- /dev/null", "+++ b/a.cpp", "@@ -0,0 +1,3 @@", "+a", "+b", "+c"], ["--lines=1:3"]),
+            (["--- a/a.cpp", "+++ b/a.cpp", "@@ -1,3 +1,1 @@", " a", "-b", "-c"], None),
+            (["--- a/a.cpp", "+++ /dev/null", "@@ -1,2 +0,0 @@", "-a", "-b"], None),
+            (["--- a/a.cpp", "+++ b/a.cpp", "@@ -1,3 +1,3 @@", " a", "-b", "+B", "-c", "+C"], ["--lines=2:3"]),
+            (["--- a/a.cpp", "+++ b/a.cpp", "@@ -1,2 +1,2 @@", "-a", "+A", "-b", "+B", "@@ -3 +3 @@", "-c", "+C"], ["--lines=1:3"]),
+            (["--- a/a.cpp", "+++ b/a.cpp", "@@ -1 +1 @@", "-a", "+A", "@@ -6,2 +6,3 @@", " f", "+g", "+h"], ["--lines=1:1", "--lines=7:8"]),
+            (["--- a/a.cpp", "+++ b/a.cpp", "@@ -2,2 +2,1 @@", "-b", "-c", "+C", "@@ -5 +4,2 @@", " e", "+f"], ["--lines=2:2", "--lines=5:5"]),
+            ([], None),
+        ]
+        for diff, expected in cases:
+            self.assertEqual(check_commit_style.range_arguments(diff, style), expected, diff)
+            self.assertEqual(check_commit_style.range_arguments(diff, {}), [])
+
+    def test_load_configuration_errors(self):
+        valid = {"suffixes": [".cpp"], "styler_command": ["clang-format"]}
+        invalid = [
+            [],
+            {"jobs": 1},
+            {"style_config": []},
+            {"style_config": {"c-like": {"styler_command": ["clang-format"]}}},
+            {"style_config": {"c-like": dict(valid, suffixes=".cpp")}},
+            {"style_config": {"c-like": dict(valid, backend="unknown")}},
+            {"style_config": {"c-like": {"suffixes": [".cpp"]}}},
+            {"style_config": {"c-like": {"suffixes": [".cpp"], "backend": "python"}}},
+            {"style_config": {"c-like": {"suffixes": [".cpp"], "backend": "python", "python_styler": "black",
+                                         "range_argument": "--lines={first}:{last}"}}},
+            {"style_config": {"c-like": dict(valid, range_argument=["--lines"])}},
+            {"style_config": {"c-like": dict(valid, stdin_argument=1)}},
+            {"style_config": {"c-like": dict(valid, timeout=0)}},
+            {"style_config": {"c-like": dict(valid, memory_limit="2G")}},
+            {"style_config": {"c-like": {"suffixes": [".py"], "backend": "python", "python_styler": "black", "timeout": 10}}},
+            {"style_config": {"c-like": dict(valid, diff_algorithm="histogram")}},
+            {"style_config": {"c-like": dict(valid, diff_linear_space="yes")}},
+            {"style_config": {"c-like": dict(valid, globs="*.inc")}},
+            {"style_config": {"c-like": valid}, "exclude": "vendor/*"},
+            {"style_config": {"c-like": valid}, "jobs": 0},
+            {"style_config": {"c-like": valid}, "cache_dir": 1},
+            {"style_config": {"c-like": valid}, "cache_max_size": -1},
+            {"style_config": {"c-like": valid}, "ledger": True},
+            {"style_config": {"c-like": valid}, "guard": []},
+            {"style_config": {"c-like": valid}, "guard": {"unknown": 1}},
+            {"style_config": {"c-like": valid}, "guard": {"max_blob_size": 0}},
+            {"style_config": {"c-like": valid}, "guard": {"generated_markers": [1]}},
+        ]
+
+        previous_directory = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            for yaml_object in invalid:
+                self.write_configuration(json.dumps(yaml_object))
+                self.assertRaises(RuntimeError, check_commit_style.load_configuration)
+
+            self.write_configuration(json.dumps({"style_config": {"c-like": dict(valid, timeout=10)}, "jobs": 2}))
+            check_commit_style.load_configuration()
+            self.assertEqual(check_commit_style.configuration, {"c-like": dict(valid, timeout=10)})
+            self.assertEqual(check_commit_style.settings["jobs"], 2)
+        finally:
+            os.chdir(previous_directory)
+            check_commit_style.settings.update(check_commit_style.DEFAULT_SETTINGS)
+
+    def test_skip_reason(self):
+        git_diff = ["diff --git a/deleted.cpp b/deleted.cpp", "deleted file mode 100644", "index 3a26bdb..0000000",
+                    "--- a/deleted.cpp", "+++ /dev/null", "@@ -1 +0,0 @@", "-int a;",
+                    "diff --git a/empty.cpp b/empty.cpp", "new file mode 100644", "index 0000000..e69de29",
+                    "diff --git a/binary.cpp b/binary.cpp", "index 1b906cf..3a26bdb 100644",
+                    "Binary files a/binary.cpp and b/binary.cpp differ",
+                    "diff --git a/patch.cpp b/patch.cpp", "index 1b906cf..3a26bdb 100644", "GIT binary patch", "literal 3",
+                    "diff --git a/shorter.cpp b/shorter.cpp", "index 1b906cf..3a26bdb 100644",
+                    "--- a/shorter.cpp", "+++ b/shorter.cpp", "@@ -1,2 +1 @@", " int a;", "-int b;",
+                    "diff --git a/moved.cpp b/renamed.cpp", "similarity index 90%", "rename from moved.cpp", "rename to renamed.cpp",
+                    "index 1b906cf..3a26bdb 100644", "--- a/moved.cpp", "+++ b/renamed.cpp", "@@ -1 +1 @@", "-int a;", "+int  a;",
+                    "diff --git a/old.cpp b/new.cpp", "similarity index 100%", "rename from old.cpp", "rename to new.cpp",
+                    "diff --git a/changed.cpp b/changed.cpp", "index 1b906cf..3a26bdb 100644",
+                    "--- a/changed.cpp", "+++ b/changed.cpp", "@@ -1 +1,2 @@", " int a;", "+int  b;"]
+        expected = {"deleted.cpp": "deleted", "empty.cpp": "no content changes", "binary.cpp": "binary", "patch.cpp": "binary",
+                    "shorter.cpp": "deletions only", "renamed.cpp": None, "changed.cpp": None}
+
+        # pure renames have no "index" line, they are never parsed
+        parsed = diff_util.parse_git_diff(git_diff)
+        self.assertEqual({ path: check_commit_style.skip_reason(parsed[path]) for path in parsed }, expected)
+
+    def test_style_changes_keeps_only_blocks(self):
+        diff = ["--- a/a.cpp", "+++ b/a.cpp", "@@ -1,4 +1,4 @@", " int a;", "-int b;", "+int  b;", " int c;", " int  d;"]
+        content = b"int a;\nint  b;\nint c;\nint  d;\n"
+        result = check_commit_style.style_changes("a.cpp", diff, {}, backend=FakeBackend({}), content=content)
+        self.assertEqual(sorted(result), ["changes", "ledger_key", "slices"])
+        self.assertEqual(result["changes"].blocks(), [{"in_start": 1, "in_len": 1, "out_start": 1, "out_len": 1},
+                                                      {"in_start": 3, "in_len": 1, "out_start": 3, "out_len": 1}])
+        self.assertEqual(result["slices"], {(1, 2): "int b;", (3, 4): "int d;"})
+
+    def test_check_files_concurrently(self):
+        diff = ["--- a/a.cpp", "+++ b/a.cpp", "@@ -1 +1 @@", "-int a;", "+int  a;"]
+        files = [ "file{}.cpp".format(i) for i in range(6) ]
+        backend = FakeBackend({ file: 0.05 * (len(files) - i) for i, file in enumerate(files) })
+        checks = [ (file, diff, {}, backend) for file in files ]
+        contents = { file: b"int  a;\n" for file in files }
+
+        expected = [ (file, [(2, "int a;")]) for file in files ]
+        self.assertEqual(check_commit_style.check_files(checks, 1, contents=contents), expected)
+        backend.threads.clear()
+        self.assertEqual(check_commit_style.check_files(checks, 4, contents=contents), expected)
+        self.assertGreater(len(backend.threads), 1)
+
+    def test_check_files_single_batch(self):
+        diff = ["--- a/a.cpp", "+++ b/a.cpp", "@@ -1 +1 @@", "-int a;", "+int  a;"]
+        backend = FakeBackend({})
+        checks = [ (file, diff, {}, backend) for file in ("a.cpp", "styled.cpp", "b.cpp") ]
+        contents = {"a.cpp": b"int  a;\n", "styled.cpp": b"int a;\n", "b.cpp": b"int  b;\n"}
+
+        batches = []
+        batch = check_commit_style.changed_check_style.style_suggestions_batch
+
+        def recording_batch(files, use_github_diff_line_number=False):
+            files = list(files)
+            batches.append([ file for file, _, _ in files ])
+            return batch(files, use_github_diff_line_number)
+
+        check_commit_style.changed_check_style.style_suggestions_batch = recording_batch
+        try:
+            checked = check_commit_style.check_files(checks, 2, contents=contents)
+        finally:
+            check_commit_style.changed_check_style.style_suggestions_batch = batch
+
+        self.assertEqual(checked, [("a.cpp", [(2, "int a;")]), ("styled.cpp", []), ("b.cpp", [(2, "int b;")])])
+        self.assertEqual(batches, [["a.cpp", "styled.cpp", "b.cpp"]])
+
+    def test_check_files_worker_error(self):
+        diff = ["--- a/a.cpp", "+++ b/a.cpp", "@@ -1 +1 @@", "-int a;", "+int  a;"]
+        backend = FakeBackend({})
+        checks = [ (file, diff, {}, backend) for file in ("a.cpp", "broken.cpp", "b.cpp") ]
+        contents = dict.fromkeys(("a.cpp", "broken.cpp", "b.cpp"), b"int  a;\n")
+        for jobs in (1, 3):
+            with self.assertRaisesRegex(ValueError, "styler failed"):
+                check_commit_style.check_files(checks, jobs, contents=contents)
+
+    def test_check_files_memory_limit(self):
+        import styler_backends
+        diff = ["--- a/a.cpp", "+++ b/a.cpp", "@@ -1 +1 @@", "-int a;", "+int  a;"]
+        backend = styler_backends.SubprocessBackend({"styler_command": ["python3", "-c", "bytearray(1024 ** 3)"],
+                                                     "memory_limit": 256 * 1024 ** 2})
+        backend.identity = lambda: ["python3"]
+        checks = [("a.cpp", diff, {}, backend), ("b.cpp", diff, {}, FakeBackend({}))]
+        contents = {"a.cpp": b"int  a;\n", "b.cpp": b"int  a;\n"}
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            checked = check_commit_style.check_files(checks, 2, contents=contents)
+        self.assertEqual(checked, [("a.cpp", []), ("b.cpp", [(2, "int a;")])])
+        self.assertIn("skipped a.cpp: ", output.getvalue())
+
+    def test_check_files_with_ledger(self):
+        import suggestion_ledger
+        diff = ["--- a/a.cpp", "+++ b/a.cpp", "@@ -1 +1 @@", "-int a;", "+int  a;"]
+        backend = FakeBackend({})
+        checks = [ (file, diff, {}, backend) for file in ("a.cpp", "b.cpp") ]
+        contents = {"a.cpp": b"int  a;\n", "b.cpp": b"int  a;\n"}
+        expected = [("a.cpp", [(2, "int a;")]), ("b.cpp", [(2, "int a;")])]
+        ledger_path = os.path.join(self.directory.name, "ledger.json")
+
+        ledger = suggestion_ledger.SuggestionLedger(ledger_path)
+        self.assertEqual(check_commit_style.check_files(checks, 2, ledger=ledger, contents=contents), expected)
+        ledger.save()
+        self.assertEqual(sorted(backend.styled), ["a.cpp", "b.cpp"])
+
+        # unchanged files aren't styled again
+        backend.styled.clear()
+        ledger = suggestion_ledger.SuggestionLedger(ledger_path)
+        self.assertEqual(check_commit_style.check_files(checks, 2, ledger=ledger, contents=contents), expected)
+        self.assertEqual(backend.styled, [])
+
+        # changed file and upgraded styler are styled again
+        contents["b.cpp"] = b"int  b;\n"
+        self.assertEqual(check_commit_style.check_files(checks, 1, ledger=ledger, contents=contents)[1], ("b.cpp", [(2, "int b;")]))
+        self.assertEqual(backend.styled, ["b.cpp"])
+        backend.version = "2.0"
+        check_commit_style.check_files(checks, 1, ledger=ledger, contents=contents)
+        self.assertEqual(backend.styled, ["b.cpp", "a.cpp", "b.cpp"])
+
+    def test_lazy_imports(self):
+        script = "import sys, check_commit_style; print(' '.join(sorted(sys.modules)))"
+        modules = subprocess.run([sys.executable, "-c", script], capture_output=True, check=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__))).stdout.decode().split()
+        for module in ("yaml", "unittest", "http.client", "github_reporter", "suggestion_ledger", "cProfile"):
+            self.assertNotIn(module, modules)
+
+    def test_config_cache_dir_setting(self):
+        script = "import check_commit_style; print(check_commit_style.config_cache_dir)"
+        environment = dict(os.environ, STYLE_POLICE_CACHE_DIR="cache", PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, check=True, cwd=self.directory.name,
+                                env=environment).stdout.decode().strip()
+        self.assertEqual(output, os.path.join(os.path.realpath(self.directory.name), "cache"))
+
+
+class TestPullRequestRange(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_cache_dir = check_commit_style.config_cache_dir
+        check_commit_style.config_cache_dir = os.path.join(self.directory.name, "cache")
+        self.previous_directory = os.getcwd()
+        os.chdir(self.directory.name)
+
+        # main: base -> main change, pull request: base -> feature change, HEAD: synthetic merge of both
+        self.repository = Repository(self.directory.name)
+        self.repository.git("checkout", "-qb", "main")
+        self.base = self.repository.commit("base", {
+            "style_config.yaml": "style_config:\n  c-like:\n    suffixes: [.cpp]\n    styler_command: [sed, -e, \"s/  */ /g\"]\n"
+                                 "    stdin_argument: -e s|{path}||\n",
+            "main.cpp": "int a;\n", "feature.cpp": "int b;\n"})
+        self.repository.git("checkout", "-qb", "feature")
+        self.head = self.repository.commit("feature", {"feature.cpp": "int b;\nint  c;\n"})
+        self.repository.git("checkout", "-q", "main")
+        self.main = self.repository.commit("main change", {"main.cpp": "int a;\nint  d;\n"})
+        self.repository.git("checkout", "-q", "--detach")
+        self.repository.git("merge", "-q", "--no-ff", "-m", "merge", "feature")
+
+    def tearDown(self):
+        os.chdir(self.previous_directory)
+        check_commit_style.config_cache_dir = self.previous_cache_dir
+        self.directory.cleanup()
+
+    def test_diff_base(self):
+        self.assertEqual(check_commit_style.diff_base(None), "HEAD~1")
+        self.assertEqual(check_commit_style.diff_base(None, self.head), self.head + "~1")
+        self.assertEqual(check_commit_style.diff_base("main", self.head), self.base)
+        # the merge commit contains the target branch, its diff would have changes outside of the pull request
+        self.assertEqual(check_commit_style.diff_base("main"), self.main)
+
+    def test_check_pull_request_head(self):
+        comments = check_commit_style.check_commit(None, 1, base="main", revision=self.head)
+        self.assertEqual(comments, [{"path": "feature.cpp", "position": 2, "body": "Suggested formatting:\n```\nint c;\n```"}])
+
+    def test_max_file_size(self):
+        with open("style_config.yaml", "a") as config_file:
+            config_file.write("    max_file_size: 10\n")
+        self.assertEqual(check_commit_style.check_commit(None, 1, revision=self.head), [])
+
+    def test_check_with_ledger(self):
+        ledger_path = os.path.join(self.directory.name, "ledger.json")
+        for _ in range(2):
+            comments = check_commit_style.check_commit(None, 1, base="main", ledger_path=ledger_path, revision=self.head)
+            self.assertEqual([ comment["path"] for comment in comments ], ["feature.cpp"])
+        self.assertTrue(os.path.isfile(ledger_path))
+
+    def test_report_on_checked_revision(self):
+        with StubGitHubServer() as server:
+            with Environment({"GITHUB_REPOSITORY": "owner/repo", "GITHUB_SHA": "merge123", "GITHUB_API_URL": server.url}):
+                check_commit_style.check_commit("token", 1, revision="feature")
+
+        self.assertEqual([ (path, body) for path, _, body, _ in server.requests ],
+                         [("/repos/owner/repo/commits/{}/comments".format(self.head),
+                           {"path": "feature.cpp", "position": 2, "body": "Suggested formatting:\n```\nint c;\n```"})])
+
+    def test_pull_request_range(self):
+        event_path = os.path.join(self.directory.name, "event.json")
+        with open(event_path, "w") as event_file:
+            json.dump({"pull_request": {"number": 7, "head": {"sha": self.head}}}, event_file)
+        with Environment({"GITHUB_EVENT_PATH": event_path, "GITHUB_BASE_REF": "main"}):
+            self.assertEqual(check_commit_style.pull_request_range(True, None, None), ("origin/main", self.head))
+            self.assertEqual(check_commit_style.pull_request_range(False, "main", None), ("main", self.head))
+            self.assertEqual(check_commit_style.pull_request_range(True, None, "HEAD"), (None, "HEAD"))
+            self.assertEqual(check_commit_style.pull_request_range(False, None, None), (None, None))
+            del os.environ["GITHUB_BASE_REF"]
+            self.assertRaises(RuntimeError, check_commit_style.pull_request_range, True, None, None)
+            del os.environ["GITHUB_EVENT_PATH"]
+            self.assertEqual(check_commit_style.pull_request_range(True, None, None), (None, None))
+
+    def test_report_target(self):
+        with Environment({"GITHUB_EVENT_PATH": None, "GITHUB_REF": "refs/pull/7/merge"}):
+            self.assertEqual(check_commit_style.report_target(True, self.head), "pull/7")
+            self.assertEqual(check_commit_style.report_target(False, self.head), "commit/" + self.head)
+            os.environ["GITHUB_REF"] = "refs/heads/main"
+            self.assertEqual(check_commit_style.report_target(True, self.head), "commit/" + self.head)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from changed_check_style import line_translation_index, translate_line_numbers_onto_diff_for_github
+from diff_corpus import mutate, random_file_pair, random_source, reference_changed, reference_translate, scaled_diff, unidiff
+from diff_engine import ALGORITHMS, diff_blocks
+from diff_util import changed, changed_compact
+import random
+import tracemalloc
+import unittest
+
+
+def peak_bytes(function):
+    """Returns peak number of bytes allocated by Python while calling function."""
+
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestDiffCorpus(unittest.TestCase):
+    def test_changed_against_reference(self):
+        generator = random.Random(0)
+        for _ in range(300):
+            a, b = random_file_pair(generator, 300)
+            context = generator.choice((0, 1, 3, 5))
+            diff = unidiff(a, b, context)
+            expected = reference_changed(a, b, context)
+            self.assertEqual(changed(diff), expected)
+
+    def test_big_files_against_reference(self):
+        generator = random.Random(1)
+        for change_rate in (0.001, 0.02):
+            a = random_source(generator, 100000)
+            b = mutate(generator, a, change_rate)
+            diff = unidiff(a, b)
+            self.assertEqual(changed(diff), reference_changed(a, b))
+
+    def test_translation_against_reference(self):
+        generator = random.Random(2)
+        for _ in range(200):
+            a, b = random_file_pair(generator, 300)
+            out = changed(unidiff(a, b))["out"]
+            if not out:
+                continue
+            index = line_translation_index(out)
+            for line in [ generator.randint(-2, len(b) + 2) for _ in range(20) ]:
+                expected = reference_translate(line, out)
+                self.assertEqual(translate_line_numbers_onto_diff_for_github(line, out, True), expected)
+                self.assertEqual(translate_line_numbers_onto_diff_for_github(line, out, True, index), expected)
+
+    def test_compact_against_changed(self):
+        generator = random.Random(4)
+        for _ in range(200):
+            a, b = random_file_pair(generator, 300)
+            diff = unidiff(a, b, generator.choice((0, 1, 3)))
+            expected, compact = changed(diff), changed_compact(diff)
+            self.assertEqual(compact.blocks(), expected["blocks"])
+            out = expected["out"]
+            for line in range(-2, len(b) + 2):
+                expected_line = translate_line_numbers_onto_diff_for_github(line, out, True) + 2 if out else None
+                self.assertEqual(compact.out_diff_line(line), expected_line)
+
+    def test_memory_scaling(self):
+        # parsing a factor times bigger diff takes about factor times more memory, timing is left to benchmark.py scaling
+        factor = 4
+        small, big = scaled_diff(10000), scaled_diff(10000 * factor)
+        for parse in (changed, changed_compact):
+            self.assertLess(peak_bytes(lambda: parse(big)), 2 * factor * peak_bytes(lambda: parse(small)))
+
+    def test_diff_engine_against_corpus(self):
+        generator = random.Random(3)
+        for _ in range(100):
+            a, b = random_file_pair(generator, 500)
+            for algorithm in ALGORITHMS:
+                result, position = [], 0
+                for block in diff_blocks(a, b, algorithm):
+                    result += a[position:block["in_start"]] + b[block["out_start"]:block["out_start"] + block["out_len"]]
+                    position = block["in_start"] + block["in_len"]
+                self.assertEqual(result + a[position:], b)
+
+
+if __name__ == "__main__":
+    unittest.main()
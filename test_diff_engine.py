@@ -0,0 +1,102 @@
+from diff_engine import ALGORITHMS, changed_lines, diff_blocks
+import diff_util
+import random
+import time
+import unittest
+
+
+def longest_common_subsequence(a, b):
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+class TestDiffEngine(unittest.TestCase):
+    def apply(self, a, b, blocks):
+        """Rebuilds b from a and blocks, checking that blocks are in order and point at the right lines."""
+
+        result, position = [], 0
+        for block in blocks:
+            self.assertTrue(block["in_len"] or block["out_len"])
+            self.assertGreaterEqual(block["in_start"], position)
+            result += a[position:block["in_start"]]
+            self.assertEqual(block["out_start"], len(result))
+            result += b[block["out_start"]:block["out_start"] + block["out_len"]]
+            position = block["in_start"] + block["in_len"]
+        return result + a[position:]
+
+    def test_identical(self):
+        for algorithm in ALGORITHMS:
+            self.assertEqual(diff_blocks(["a", "b"], ["a", "b"], algorithm), [])
+            self.assertEqual(diff_blocks([], [], algorithm), [])
+
+    def test_blocks(self):
+        a = ["#include <iostream>", "", "class A", "{", "public:", "    A(){}", "};", "", "int main()", "{", "    return 1;", "}"]
+        b = ["#include <iostream>", "", "class A {", "public:", "  A() {}", "};", "", "int main() { return 1; }"]
+        expected = diff_util.changed(diff_util.diff_lines(a, b))
+        for algorithm in ALGORITHMS:
+            for linear_space in (False, True):
+                self.assertEqual(changed_lines(a, b, algorithm, linear_space).blocks(), expected["blocks"])
+
+    def test_random(self):
+        generator = random.Random(0)
+        for _ in range(500):
+            a = [ generator.randint(0, 5) for _ in range(generator.randint(0, 30)) ]
+            b = [ generator.randint(0, 5) for _ in range(generator.randint(0, 30)) ]
+            shortest = len(a) + len(b) - 2 * longest_common_subsequence(a, b)
+            for algorithm in ALGORITHMS:
+                for linear_space in (False, True):
+                    blocks = diff_blocks(a, b, algorithm, linear_space)
+                    self.assertEqual(self.apply(a, b, blocks), b)
+                    changes = sum(block["in_len"] + block["out_len"] for block in blocks)
+                    if algorithm == "myers":
+                        self.assertEqual(changes, shortest)
+                    else:
+                        self.assertGreaterEqual(changes, shortest)
+
+    def test_difflib_matches_unidiff(self):
+        generator = random.Random(1)
+        for _ in range(200):
+            a = [ str(generator.randint(0, 5)) for _ in range(generator.randint(0, 40)) ]
+            b = [ str(generator.randint(0, 5)) for _ in range(generator.randint(0, 40)) ]
+            self.assertEqual(diff_blocks(a, b, "difflib"), diff_util.changed(diff_util.diff_lines(a, b))["blocks"])
+
+    def test_edit_distance_fallback(self):
+        generator = random.Random(2)
+        for _ in range(200):
+            a = [ generator.randint(0, 5) for _ in range(generator.randint(0, 30)) ]
+            b = [ generator.randint(0, 5) for _ in range(generator.randint(0, 30)) ]
+            for algorithm in ALGORITHMS:
+                for linear_space in (False, True):
+                    for max_edit_distance in (0, 1, 4):
+                        self.assertEqual(self.apply(a, b, diff_blocks(a, b, algorithm, linear_space, max_edit_distance)), b)
+
+    def test_fully_changed_big_file(self):
+        # re-indenting changes every line, Myers would take O(N^2) time and memory without falling back to difflib
+        a = [ "int value{} = {};".format(line, line) for line in range(20000) ]
+        b = [ "    " + line for line in a ]
+        for algorithm in ALGORITHMS:
+            for linear_space in (False, True):
+                start = time.perf_counter()
+                blocks = diff_blocks(a, b, algorithm, linear_space)
+                self.assertLess(time.perf_counter() - start, 2)
+                self.assertEqual(blocks, [{"in_start": 0, "in_len": 20000, "out_start": 0, "out_len": 20000}])
+
+    def test_patience_alignment(self):
+        a = ["void f()", "{", "}", "", "void g()", "{", "}"]
+        b = ["void g()", "{", "}", "", "void f()", "{", "}"]
+        self.assertEqual(self.apply(a, b, diff_blocks(a, b, "patience")), b)
+
+    def test_bytes(self):
+        self.assertEqual(diff_blocks([b"a", b"\xff"], [b"a", b"b"]), [{"in_start": 1, "in_len": 1, "out_start": 1, "out_len": 1}])
+
+    def test_unknown_algorithm(self):
+        self.assertRaises(ValueError, diff_blocks, ["a"], ["b"], "histogram")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,401 @@
+from diff_util import (changed, diff, diff_lines, iter_git_diff, LimitExceeded, line_ranges, Output,
+                       parse_git_diff, parse_hunk_header, read_blobs, run, run_lines, split_output)
+from fixtures import Repository
+import os
+import tempfile
+import time
+import unittest
+
+
+class TestDiffUtil(unittest.TestCase):
+    def test_empty(self):
+        expected = {"changed_in": {}, "changed_out": {}, "blocks": [], "in": {}, "out": {}}
+        self.assertEqual(changed([]), expected)
+        self.assertEqual(changed(["---", "+++", "@@ -1,12 +1,13 @@"]), expected)
+
+    def test_malformed_header(self):
+        self.assertRaises(ValueError, changed, [""])
+        self.assertRaises(ValueError, changed, ["1--", "+++", "@@ -1,12 +1,13 @@"])
+        self.assertRaises(ValueError, changed, ["---", "1++", "@@ -1,12 +1,13 @@"])
+        self.assertRaises(ValueError, changed, ["---", "+++"])
+
+    def test_malformed_hunk_header(self):
+        self.assertRaises(ValueError, changed, ["---", "+++", ""])
+        self.assertRaises(ValueError, changed, ["---", "+++", "1@ -1,12 +1,13 @@"])
+        self.assertRaises(ValueError, changed, ["---", "+++", "@@ -1, +1,13 @@"])
+        self.assertRaises(ValueError, changed, ["---", "+++", "@@ -1,12 1,13 @@"])
+
+    def test_diff_small(self):
+        input = [ "--- a   2022-12-13 14:18:45.487729700 +0200",
+                  "+++ b   2022-12-13 14:18:55.380516200 +0200",
+                  "@@ -1,3 +1,3 @@",
+                  " 0",
+                  "-1",
+                  "+11",
+                  " 2" ]
+        expected = {"changed_in": {1:0}, "changed_out": {1:0}, 
+                    "blocks":[{"in_start": 1, "in_len": 1, "out_start": 1, "out_len": 1}],
+                    "in": {0: 3, 1: 4, 2: 6}, "out": {0: 3, 1: 5, 2: 6}}
+        self.assertEqual(changed(input), expected)
+
+    def test_diff_even_smaller(self):
+        input = [ "--- a   2022-12-13 14:18:45.487729700 +0200",
+                  "+++ b   2022-12-13 14:18:55.380516200 +0200",
+                  "@@ -1,1 +1,1 @@",
+                  "-1",
+                  "+11" ]
+        expected = {"changed_in": {0:0}, "changed_out": {0:0}, 
+                    "blocks":[{"in_start": 0, "in_len": 1, "out_start": 0, "out_len": 1}],
+                    "in": {0: 3}, "out": {0: 4}}
+        self.assertEqual(changed(input), expected)
+
+    def test_diff_small_consecutive(self):
+        input = [ "--- a   2022-12-13 14:18:45.487729700 +0200",
+                  "+++ b   2022-12-13 14:18:55.380516200 +0200",
+                  "@@ -1,3 +1,3 @@ what now",
+                  " 0",
+                  "-1",
+                  "+11",
+                  "-2",
+                  "+22",
+                  " 3" ]
+        expected = {"changed_in": {1:0, 2:1}, "changed_out": {1:0, 2:1}, 
+                    "blocks":[{"in_start": 1, "in_len": 1, "out_start": 1, "out_len": 1},
+                              {"in_start": 2, "in_len": 1, "out_start": 2, "out_len": 1}],
+                    "in": {0: 3, 1: 4, 2: 6, 3: 8}, "out": {0: 3, 1: 5, 2: 7, 3: 8}}
+        self.assertEqual(changed(input), expected)
+
+    def test_diff_big(self):
+        self.maxDiff = None
+        a = [ "line {}".format(line) for line in range(26) ]
+        b = a[0:2] + a[4:6] + ["changed 6"] + a[7:9] + [ "added {}".format(line) for line in range(3) ] + a[9:24] + ["changed 24"] + a[25:]
+        with tempfile.TemporaryDirectory() as directory:
+            for name, lines in (("a", a), ("b", b)):
+                with open(os.path.join(directory, name), "w") as fixture_file:
+                    fixture_file.write("".join(line + "\n" for line in lines))
+            input = diff(os.path.join(directory, "a"), os.path.join(directory, "b"))
+        expected = {"changed_in": {2: 0, 3: 0, 6: 1, 24: 3}, "changed_out": {4: 1, 7: 2, 8: 2, 9: 2, 25: 3},
+                    "blocks": [{"in_start": 2, "in_len": 2, "out_start": 2, "out_len": 0}, 
+                               {"in_start": 6, "in_len": 1, "out_start": 4, "out_len": 1}, 
+                               {"in_start": 9, "in_len": 0, "out_start": 7, "out_len": 3}, 
+                               {"in_start": 24, "in_len": 1, "out_start": 25, "out_len": 1}, 
+                              ],
+                    "in": {0: 3, 1: 4, 2: 5, 3: 6, 4: 7, 5: 8, 6: 9, 7: 11, 8: 12, 9: 16, 10: 17, 11: 18,
+                           21: 20, 22: 21, 23: 22, 24: 23, 25: 25},
+                    "out": {0: 3, 1: 4, 2: 7, 3: 8, 4: 10, 5: 11, 6: 12, 7: 13, 8: 14, 9: 15, 10: 16, 11: 17, 12: 18,
+                            22: 20, 23: 21, 24: 22, 25: 24, 26: 25}}
+        self.assertEqual(changed(input), expected)
+
+    def test_diff_lines(self):
+        a = ["0", "1", "2", "3"]
+        b = ["0", "11", "2", "3"]
+        unidiff = diff_lines(a, b)
+        self.assertEqual(unidiff, ["--- a", "+++ b", "@@ -1,4 +1,4 @@", " 0", "-1", "+11", " 2", " 3"])
+        self.assertEqual(changed(unidiff)["blocks"], [{"in_start": 1, "in_len": 1, "out_start": 1, "out_len": 1}])
+        self.assertEqual(diff_lines(a, a), [])
+
+    def test_hunk_header_without_count(self):
+        input = [ "--- a", "+++ b", "@@ -1 +1 @@", "-1", "+11" ]
+        self.assertEqual(changed(input)["blocks"], [{"in_start": 0, "in_len": 1, "out_start": 0, "out_len": 1}])
+
+    def test_output(self):
+        for data in [b"", b"a", b"a\n", b"a\nb", b"a\n\nb\n", b"\n"]:
+            output = Output(data)
+            self.assertEqual(list(output), [ line.encode() for line in split_output(data.decode()) ])
+            self.assertEqual(output.lines(), list(output))
+            self.assertEqual(output.text(0, len(output)), "\n".join(split_output(data.decode())))
+
+        output = Output(b"int a;\n// \xff\xfe\nint b;\n")
+        self.assertEqual(output[-1], b"int b;")
+        self.assertEqual(output[0:2], [b"int a;", b"// \xff\xfe"])
+        self.assertEqual(output.text(2, 3), "int b;")
+        self.assertEqual(output.text(0, 2), "int a;\n// \ufffd\ufffd")
+        self.assertEqual(output.text(2, 10), "int b;")
+        self.assertEqual(output.text(2, 2), "")
+        self.assertRaises(IndexError, output.__getitem__, 3)
+        # lines are split once and shared
+        self.assertIs(output.lines(), output.lines())
+
+    def test_diff_lines_bytes(self):
+        a = Output(b"0\n\xff\n2\n")
+        b = Output(b"0\n\xff\n22\n")
+        self.assertEqual(diff_lines(a.lines(), b.lines()), ["--- a", "+++ b", "@@ -1,3 +1,3 @@", " 0", " \ufffd", "-2", "+22"])
+
+    def test_line_ranges(self):
+        self.assertEqual(line_ranges([]), [])
+        self.assertEqual(line_ranges([5]), [(5, 6)])
+        self.assertEqual(line_ranges([7, 1, 2, 3, 9, 8, 2]), [(1, 4), (7, 10)])
+
+    def test_hunk_header(self):
+        self.assertEqual(parse_hunk_header("@@ -8,5 +8,6 @@ int main()"), (7, 7))
+        self.assertEqual(parse_hunk_header("@@ -5 +6 @@"), (4, 5))
+        self.assertEqual(parse_hunk_header("@@ -0,0 +1,3 @@"), (0, 0))
+        self.assertEqual(parse_hunk_header("@@ -5,0 +6,2 @@"), (5, 5))
+        self.assertEqual(parse_hunk_header("@@ -1,12 +0,0 @@"), (0, 0))
+        self.assertRaises(ValueError, parse_hunk_header, "@@ -a,1 +1,1 @@")
+        self.assertRaises(ValueError, parse_hunk_header, "@@ -1,1 +1,1")
+
+    def test_no_newline_at_end_of_file(self):
+        input = [ "--- a", "+++ b", "@@ -1,2 +1,2 @@", " 0", "-1", "\\ No newline at end of file", "+1" ]
+        expected = {"changed_in": {1: 0}, "changed_out": {1: 0},
+                    "blocks": [{"in_start": 1, "in_len": 1, "out_start": 1, "out_len": 1}],
+                    "in": {0: 3, 1: 4}, "out": {0: 3, 1: 6}}
+        self.assertEqual(changed(input), expected)
+
+    def test_unexpected_line_prefix(self):
+        self.assertRaises(ValueError, changed, ["---", "+++", "@@ -1,3 +1,3 @@", "?"])
+
+    def test_parse_git_diff_errors(self):
+        self.assertRaises(ValueError, parse_git_diff, ["asdf"])
+        self.assertRaises(ValueError, parse_git_diff, ["diff --git b/.github/workflows/test.yml a/.github/workflows/test.yml"])
+
+    def test_parse_git_diff_empty(self):
+        self.assertEqual(parse_git_diff(["diff --git a/.github/workflows/test.yml b/.github/workflows/test.yml", "index"]), 
+                                        {".github/workflows/test.yml": { "unidiff": [], 
+                                                                          "new_file": False, 
+                                                                          "deleted": False, 
+                                                                          "renamed": False }})
+
+    def test_read_blobs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            repository = Repository(directory)
+            repository.commit("test", {"a.cpp": b"int a;\n\nint b;\n", "empty.h": b""})
+            repository.write({"a.cpp": b"changed in working tree"})
+
+            previous_directory = os.getcwd()
+            os.chdir(directory)
+            try:
+                blobs = read_blobs("HEAD", ["a.cpp", "missing.cpp", "empty.h"])
+            finally:
+                os.chdir(previous_directory)
+
+        self.assertEqual(blobs, {"a.cpp": b"int a;\n\nint b;\n", "empty.h": b""})
+
+    def test_run_limits(self):
+        self.assertEqual(run(["echo", "a"], limits={"timeout": 10, "cpu_limit": 10, "memory_limit": 1024 ** 3}), "a\n")
+
+        start = time.perf_counter()
+        self.assertRaises(LimitExceeded, run, ["sleep", "10"], limits={"timeout": 0.2})
+        self.assertRaises(LimitExceeded, run, ["sh", "-c", "sleep 10; echo"], limits={"timeout": 0.2})
+        self.assertLess(time.perf_counter() - start, 5)
+
+        self.assertRaises(LimitExceeded, run, ["sh", "-c", "while :; do :; done"], limits={"cpu_limit": 1, "timeout": 10})
+        self.assertRaises(LimitExceeded, run, ["python3", "-c", "bytearray(1024 ** 3)"], limits={"memory_limit": 256 * 1024 ** 2})
+
+        # limits are in place before command starts
+        self.assertEqual(run(["sh", "-c", "ulimit -t; ulimit -v"], limits={"cpu_limit": 7, "memory_limit": 1024 ** 3}),
+                         "7\n{}\n".format(1024 ** 2))
+
+    def test_run_lines(self):
+        self.assertEqual(list(run_lines(["printf", "a\\nb\\n\\nc"])), ["a", "b", "", "c"])
+        self.assertRaises(RuntimeError, list, run_lines(["false"]))
+
+    def test_iter_git_diff_accept(self):
+        input = [
+            "diff --git a/package-lock.json b/package-lock.json",
+            "index cb179e3..066ddb8 100644",
+            "--- a/package-lock.json",
+            "+++ b/package-lock.json",
+            "@@ -1 +1 @@",
+            "-{}",
+            "+{ }",
+            "diff --git a/main.cpp b/main.cpp",
+            "index 1b906cf..3a26bdb 100644",
+            "--- a/main.cpp",
+            "+++ b/main.cpp",
+            "@@ -1 +1 @@",
+            "-int a;",
+            "+int  a;" ]
+        parsed = iter_git_diff(iter(input), lambda path: path.endswith(".cpp"))
+        self.assertEqual(next(parsed), ("main.cpp", { "unidiff": input[9:], "new_file": False, "deleted": False, "renamed": False }))
+        self.assertRaises(StopIteration, next, parsed)
+        self.assertEqual(list(parse_git_diff(input)), ["package-lock.json", "main.cpp"])
+
+    def test_parse_git_diff_small(self):
+        self.assertEqual(parse_git_diff([]), {})
+
+    def test_parse_git_diff(self):
+        input = [
+            "diff --git a/.github/workflows/test.yml b/.github/workflows/test.yml",
+            "index cb179e3..066ddb8 100644",
+            "--- a/.github/workflows/test.yml",
+            "+++ b/.github/workflows/test.yml",
+            "@@ -15,8 +15,11 @@ jobs:",
+            "           echo $GITHUB_WORKSPACE",
+            "           echo {{ github.repository }}",
+            "           echo hell0 world",
+            "+",
+            "+          # unit tests",
+            "           python3 addition.py",
+            "           python3 changed.py",
+            "+",
+            "           docker image ls",
+            "           clang-format --version",
+            "           echo $GITHUB_SHA",
+            "diff --git a/changed.py b/changed.py",
+            "index 1b906cf..3a26bdb 100644",
+            "--- a/changed.py",
+            "+++ b/changed.py",
+            "@@ -3,6 +3,11 @@ import re",
+            " import subprocess",
+            "",
+            "",
+            "+def parse_git_diff(git_diff):",
+            "+    pass",
+            "+",
+            "+",
+            " def run(command, valid_return_codes=[0], ignore_return=False):",
+            "     r = subprocess.run(command, capture_output=True)",
+            "     if not ignore_return and r.returncode not in valid_return_codes:",
+            "@@ -148,6 +153,14 @@ class TestChanged(unittest.TestCase):",
+            "                               ]}",
+            "         self.assertEqual(changed(input), expected)",
+            "",
+            "+    def test_parse_git_diff(self):",
+            "+        input = [",
+            "+",
+            "+        ]",
+            "+        actual = parse_git_diff(input)",
+            "+        expected = {}",
+            "+        self.assertEqual(actual, expected)",
+            "+",
+            "",
+            " if __name__ == '__main__':",
+            "     unittest.main()",
+            "diff --git a/changed_check_style.py b/changed_check_style.py",
+            "index d755c97..4f9fe22 100644",
+            "--- a/changed_check_style.py",
+            "+++ b/changed_check_style.py",
+            "@@ -3,11 +3,14 @@ import changed",
+            "     changes_unidiff = changed.diff(base, changes)",
+            "",
+            "-    changes_diff_data = changed.changed(changes_unidiff)",
+            "+    changes_diff_data =  changed.changed(changes_unidiff)",
+            "     style_diff_data = changed.changed(style_unidiff)",
+        ]
+        actual = parse_git_diff(input)
+        expected = {".github/workflows/test.yml": { "unidiff": [
+                                                        "--- a/.github/workflows/test.yml",
+                                                        "+++ b/.github/workflows/test.yml",
+                                                        "@@ -15,8 +15,11 @@ jobs:",
+                                                        "           echo $GITHUB_WORKSPACE",
+                                                        "           echo {{ github.repository }}",
+                                                        "           echo hell0 world",
+                                                        "+",
+                                                        "+          # unit tests",
+                                                        "           python3 addition.py",
+                                                        "           python3 changed.py",
+                                                        "+",
+                                                        "           docker image ls",
+                                                        "           clang-format --version",
+                                                        "           echo $GITHUB_SHA" ], 
+                                                    "new_file": False, 
+                                                    "deleted": False, 
+                                                    "renamed": False },
+                    "changed.py": { "unidiff": [
+                                        "--- a/changed.py",
+                                        "+++ b/changed.py",
+                                        "@@ -3,6 +3,11 @@ import re",
+                                        " import subprocess",
+                                        "",
+                                        "",
+                                        "+def parse_git_diff(git_diff):",
+                                        "+    pass",
+                                        "+",
+                                        "+",
+                                        " def run(command, valid_return_codes=[0], ignore_return=False):",
+                                        "     r = subprocess.run(command, capture_output=True)",
+                                        "     if not ignore_return and r.returncode not in valid_return_codes:",
+                                        "@@ -148,6 +153,14 @@ class TestChanged(unittest.TestCase):",
+                                        "                               ]}",
+                                        "         self.assertEqual(changed(input), expected)",
+                                        "",
+                                        "+    def test_parse_git_diff(self):",
+                                        "+        input = [",
+                                        "+",
+                                        "+        ]",
+                                        "+        actual = parse_git_diff(input)",
+                                        "+        expected = {}",
+                                        "+        self.assertEqual(actual, expected)",
+                                        "+",
+                                        "",
+                                        " if __name__ == '__main__':",
+                                        "     unittest.main()" ], 
+                                    "new_file": False, 
+                                    "deleted": False, 
+                                    "renamed": False },
+                    "changed_check_style.py": { "unidiff": [
+                                    "--- a/changed_check_style.py",
+                                    "+++ b/changed_check_style.py",
+                                    "@@ -3,11 +3,14 @@ import changed",
+                                    "     changes_unidiff = changed.diff(base, changes)",
+                                    "",
+                                    "-    changes_diff_data = changed.changed(changes_unidiff)",
+                                    "+    changes_diff_data =  changed.changed(changes_unidiff)",
+                                    "     style_diff_data = changed.changed(style_unidiff)" ], 
+                                                "new_file": False, 
+                                                "deleted": False, 
+                                                "renamed": False }
+        }
+
+        self.assertEqual(actual, expected)
+
+    def test_parse_git_diff_with_changed_files(self):
+        input = [
+            "diff --git a/wrongfully_formatted-b.cpp b/wrongfully_formatted-b.cpp",
+            "new file mode 100644",
+            "index 0000000..e69de29",
+            "diff --git a/wrongfully_formatted-a.cpp b/wrongfully_formatted-c.cpp",
+            "similarity index 100%",
+            "rename from wrongfully_formatted-a.cpp",
+            "rename to wrongfully_formatted-c.cpp",
+            "diff --git a/wrongfully_formatted-d.cpp b/wrongfully_formatted-d.cpp",
+            "deleted file mode 100644",
+            "index af5846b..0000000",
+            "--- a/wrongfully_formatted-d.cpp",
+            "+++ /dev/null",
+            "@@ -1,12 +0,0 @@",
+            "-#include <iostream>",
+            "-",
+            "-class A",
+            "-{",
+            "-public:",
+            "-    A(){}",
+            "-};",
+            "-",
+            "-int main()",
+            "-{",
+            "-    return 1;",
+            "-}"
+        ]
+        actual = parse_git_diff(input)
+        expected = {"wrongfully_formatted-b.cpp": { "unidiff": [], 
+                                                    "new_file": True, 
+                                                    "deleted": False, 
+                                                    "renamed": False },
+                    "wrongfully_formatted-d.cpp": { "unidiff": [
+                                                    "--- a/wrongfully_formatted-d.cpp",
+                                                    "+++ /dev/null",
+                                                    "@@ -1,12 +0,0 @@",
+                                                    "-#include <iostream>",
+                                                    "-",
+                                                    "-class A",
+                                                    "-{",
+                                                    "-public:",
+                                                    "-    A(){}",
+                                                    "-};",
+                                                    "-",
+                                                    "-int main()",
+                                                    "-{",
+                                                    "-    return 1;",
+                                                    "-}" ], 
+                                                "new_file": False, 
+                                                "deleted": True, 
+                                                "renamed": False }
+        }
+
+        self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+from file_guard import changed_line_counts, DEFAULT_THRESHOLDS, guard, sample_reason
+from fixtures import Repository
+import os
+import tempfile
+import unittest
+
+
+class TestFileGuard(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_directory = os.getcwd()
+        os.chdir(self.directory.name)
+        self.repository = Repository(self.directory.name)
+        self.repository.commit("base", {"normal.cpp": "int a;\n", "renamed.cpp": "int r;\n" * 10, "removed.cpp": "int d;\n"})
+
+        self.repository.write({".gitattributes": "attributes.cpp linguist-generated\n",
+                               "normal.cpp": "int a;\nint b;\n",
+                               "attributes.cpp": "int c;\n",
+                               "marker.cpp": "// @generated by a tool\nint c;\n",
+                               "minified.cpp": "int a; " * 100 + "\n",
+                               "big.cpp": "int a;\n" * 1000,
+                               "binary.cpp": "\0\1\2"})
+        os.rename("renamed.cpp", "moved.cpp")
+        os.remove("removed.cpp")
+        self.repository.commit("change")
+
+        self.thresholds = dict(DEFAULT_THRESHOLDS, max_blob_size=5000, max_changed_lines=500)
+
+    def tearDown(self):
+        os.chdir(self.previous_directory)
+        self.directory.cleanup()
+
+    def test_changed_line_counts(self):
+        counts = changed_line_counts("HEAD~1", "HEAD")
+        self.assertEqual(counts["normal.cpp"], (1, 0))
+        self.assertEqual(counts["moved.cpp"], (0, 0))
+        self.assertEqual(counts["removed.cpp"], (0, 1))
+        self.assertEqual(counts["binary.cpp"], None)
+        self.assertNotIn("renamed.cpp", counts)
+
+    def test_guard(self):
+        expected = {"attributes.cpp": "generated: linguist-generated",
+                    "marker.cpp": "generated: @generated marker",
+                    "minified.cpp": "generated: average line length 700",
+                    "big.cpp": "oversized: 1000 changed lines"}
+        for revision in (None, "HEAD"):
+            reasons, contents = guard("HEAD~1", revision, lambda path: path.endswith(".cpp"), self.thresholds)
+            self.assertEqual(reasons, expected)
+            if revision is None:
+                self.assertIsNone(contents)
+            else:
+                self.assertEqual(contents["normal.cpp"], b"int a;\nint b;\n")
+                self.assertNotIn("marker.cpp", contents)
+
+        reasons, _ = guard("HEAD~1", "HEAD", lambda path: path.endswith(".cpp"), dict(self.thresholds, max_changed_lines=5000))
+        self.assertEqual(reasons["big.cpp"], "oversized: 7000 bytes")
+
+        reasons, _ = guard("HEAD~1", "HEAD", lambda path: path == "normal.cpp", self.thresholds)
+        self.assertEqual(reasons, {})
+
+    def test_max_size(self):
+        def max_size(path):
+            return 10 if path == "normal.cpp" else None
+
+        for revision in (None, "HEAD"):
+            reasons, contents = guard("HEAD~1", revision, lambda path: path.endswith(".cpp"), self.thresholds, max_size)
+            self.assertEqual(reasons["normal.cpp"], "oversized: 14 bytes")
+            self.assertEqual(reasons["big.cpp"], "oversized: 1000 changed lines")
+            if revision is not None:
+                # oversized files are never read
+                self.assertEqual(sorted(contents), ["binary.cpp", "moved.cpp"])
+
+    def test_sample_reason(self):
+        self.assertIsNone(sample_reason(b"int a;\n" * 2000))
+        self.assertIsNone(sample_reason(b""))
+        self.assertEqual(sample_reason(b"/* DO NOT EDIT */\n"), "generated: DO NOT EDIT marker")
+        self.assertEqual(sample_reason(b"x" * 8192), "generated: average line length 8192")
+        self.assertIsNone(sample_reason(b"int a;\n" * 1170 + b"x" * 202))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+from fixtures import Environment, StubGitHubServer
+from github_reporter import GitHubReporter, pull_request_head, pull_request_number
+import json
+import os
+import tempfile
+import time
+import unittest
+
+
+class TestGitHubReporter(unittest.TestCase):
+    def setUp(self):
+        self.server = StubGitHubServer()
+        self.requests = self.server.requests
+        self.reporter = GitHubReporter("token", "owner/repo", "abc123", api_url=self.server.url, jobs=1, backoff=0)
+        self.delays = []
+        self.reporter.sleep = self.delays.append
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_commit_comments_share_connection(self):
+        comments = [{"path": "a.cpp", "position": i, "body": "body"} for i in range(3)]
+        self.reporter.post_commit_comments(comments)
+        self.assertEqual([r[0] for r in self.requests], ["/repos/owner/repo/commits/abc123/comments"] * 3)
+        self.assertEqual([r[2] for r in self.requests], comments)
+        self.assertEqual(self.requests[0][1], "Bearer token")
+        self.assertEqual(len({r[3] for r in self.requests}), 1)
+
+    def test_concurrent_commit_comments(self):
+        self.reporter.jobs = 4
+        comments = [{"path": "a.cpp", "position": i, "body": "body"} for i in range(20)]
+        self.reporter.post_commit_comments(comments)
+        self.assertEqual(sorted(r[2]["position"] for r in self.requests), list(range(20)))
+
+    def test_retry_on_rate_limit(self):
+        self.server.responses = [(429, {"Retry-After": "3"}), (403, {"x-ratelimit-remaining": "0"}), (201, {})]
+        self.reporter.post_commit_comment({"path": "a.cpp", "position": 1, "body": "body"})
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(self.delays, [3.0, 0.0])
+
+    def test_no_retry_on_forbidden(self):
+        self.server.responses = [(403, {})]
+        self.assertRaises(RuntimeError, self.reporter.post_commit_comment, {"path": "a.cpp", "position": 1, "body": "body"})
+        self.assertEqual(len(self.requests), 1)
+
+    def test_retries_exhausted(self):
+        self.reporter.max_retries = 2
+        self.server.responses = [(429, {})] * 3
+        self.assertRaises(RuntimeError, self.reporter.post_commit_comment, {"path": "a.cpp", "position": 1, "body": "body"})
+        self.assertEqual(len(self.requests), 3)
+
+    def test_no_duplicate_post_after_disconnect(self):
+        self.server.responses = [(None, {})]
+        self.assertRaises(ConnectionError, self.reporter.post_commit_comment, {"path": "a.cpp", "position": 1, "body": "body"})
+        self.assertEqual(len(self.requests), 1)
+
+    def test_reconnect_after_idle_close(self):
+        self.server.close_after_response = True
+        comments = [{"path": "a.cpp", "position": i, "body": "body"} for i in range(3)]
+        for comment in comments:
+            self.reporter.post_commit_comment(comment)
+            # let the close reach the idle connection, as it does when the server times it out
+            time.sleep(0.1)
+        self.assertEqual([r[2] for r in self.requests], comments)
+
+    def test_review(self):
+        comments = [{"path": "a.cpp", "position": i, "body": "body"} for i in range(3)]
+        self.reporter.post_review(7, comments)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.requests[0][0], "/repos/owner/repo/pulls/7/reviews")
+        self.assertEqual(self.requests[0][2]["comments"], comments)
+        self.assertEqual(self.requests[0][2]["commit_id"], "abc123")
+
+
+class TestGitHubEnvironment(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.event_path = os.path.join(self.directory.name, "event.json")
+        self.environment = Environment({"GITHUB_REPOSITORY": "owner/repo", "GITHUB_SHA": "merge123", "GITHUB_EVENT_PATH": self.event_path,
+                                        "GITHUB_REF": "refs/pull/7/merge"})
+
+    def tearDown(self):
+        self.environment.restore()
+        self.directory.cleanup()
+
+    def write_event(self, event):
+        with open(self.event_path, "w") as event_file:
+            json.dump(event, event_file)
+
+    def test_pull_request_event(self):
+        self.write_event({"pull_request": {"number": 8, "head": {"sha": "head123"}}})
+        self.assertEqual(pull_request_number(), 8)
+        self.assertEqual(pull_request_head(), "head123")
+
+    def test_push_event(self):
+        self.write_event({"head_commit": {"id": "merge123"}})
+        self.assertEqual(pull_request_number(), 7)
+        self.assertIsNone(pull_request_head())
+
+        os.environ["GITHUB_REF"] = "refs/heads/main"
+        del os.environ["GITHUB_EVENT_PATH"]
+        self.assertIsNone(pull_request_number())
+        self.assertIsNone(pull_request_head())
+
+    def test_review_payload(self):
+        comments = [{"path": "a.cpp", "position": 1, "body": "body"}]
+        self.assertEqual(GitHubReporter.from_environment("token").review_payload(comments)["commit_id"], "merge123")
+
+        self.write_event({"pull_request": {"number": 8, "head": {"sha": "head123"}}})
+        payload = GitHubReporter.from_environment("token", pull_request_head()).review_payload(comments, "body")
+        self.assertEqual(payload, {"commit_id": "head123", "body": "body", "event": "COMMENT", "comments": comments})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+from instrumentation import (count, file_timer, profile, record_bytes_read, record_subprocess, report, reset, stage,
+                             step_summary)
+import unittest
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        reset()
+
+    def test_stages_and_files(self):
+        with stage("parse"):
+            pass
+        with stage("parse"):
+            pass
+        with file_timer("a.cpp"):
+            pass
+        record_subprocess(["/usr/bin/clang-format", "a.cpp"], 0.5, 100)
+        record_subprocess(["clang-format", "b.cpp"], 0.25, 20)
+        record_bytes_read("files", 10)
+        count("skipped: deleted")
+        count("skipped: deleted", 2)
+
+        data = report()
+        self.assertEqual(data["stages"]["parse"]["count"], 2)
+        self.assertIn("a.cpp", data["files"])
+        self.assertEqual(data["subprocesses"]["clang-format"], {"count": 2, "seconds": 0.75, "output_bytes": 120})
+        self.assertEqual(data["bytes_read"]["files"]["bytes"], 10)
+        self.assertEqual(data["counters"]["skipped: deleted"]["count"], 3)
+        self.assertIn("| parse | 2 |", step_summary(data))
+
+        reset()
+        self.assertEqual(report()["stages"], {})
+
+    def test_profile(self):
+        with profile("cprofile"):
+            sorted(range(1000))
+        with profile("tracemalloc"):
+            data = [ str(i) for i in range(1000) ]
+        self.assertIn("cprofile", report()["profile"])
+        self.assertGreater(report()["profile"]["tracemalloc"]["peak_bytes"], 0)
+        self.assertRaises(ValueError, profile("unknown").__enter__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+from style_cache import blob_hash, StyleCache
+import os
+import tempfile
+import unittest
+
+
+class TestStyleCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = StyleCache(self.directory.name, max_size=10)
+        self.style = {"suffixes": [".cpp"], "styler_command": ["true", "-style=Mozilla"]}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_blob_hash(self):
+        self.assertEqual(blob_hash(b""), "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391")
+        self.assertEqual(blob_hash(b"hello\n"), "ce013625030ba8dba906f756967f9e9ca394464a")
+
+    def test_key(self):
+        identity = ["clang-format", "-style=Mozilla", "clang-format version 14.0.0"]
+        key = self.cache.key(b"int a;", identity, self.style)
+        self.assertEqual(key, self.cache.key(b"int a;", list(identity), dict(self.style)))
+        self.assertNotEqual(key, self.cache.key(b"int b;", identity, self.style))
+        self.assertNotEqual(key, self.cache.key(b"int a;", identity, self.style, ["--lines=1:1"]))
+        self.assertNotEqual(key, self.cache.key(b"int a;", identity[:2] + ["clang-format version 15.0.0"], self.style))
+        self.assertNotEqual(key, self.cache.key(b"int a;", identity, {"suffixes": [".cpp", ".h"], "styler_command": ["true", "-style=Mozilla"]}))
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", b"int a;\n")
+        self.assertEqual(self.cache.get("a"), b"int a;\n")
+
+    def test_evict_least_recently_used(self):
+        for i, key in enumerate(["a", "b", "c"]):
+            self.cache.put(key, b"1234")
+            os.utime(self.cache.path(key), (i, i))
+        self.cache.get("a")
+        self.cache.evict()
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get("a"), b"1234")
+        self.assertEqual(self.cache.get("c"), b"1234")
+
+
+if __name__ == "__main__":
+    unittest.main()
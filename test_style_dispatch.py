@@ -0,0 +1,34 @@
+from style_dispatch import StyleDispatcher
+import unittest
+
+
+class TestStyleDispatch(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = StyleDispatcher({"c-like": {"suffixes": [".c", ".h", ".cpp", ".hpp"],
+                                                      "exclude": ["third_party/*", "*.pb.h"]},
+                                           "python": {"suffixes": [".py"], "globs": ["scripts/*", "SConstruct"]},
+                                           "headers": {"suffixes": [".h", ".inl"]}},
+                                          exclude=["vendor/*"])
+
+    def test_suffixes(self):
+        self.assertEqual(self.dispatcher.resolve("src/main.cpp"), "c-like")
+        self.assertEqual(self.dispatcher.resolve("src/main.h"), "c-like")
+        self.assertEqual(self.dispatcher.resolve("src/main.inl"), "headers")
+        self.assertEqual(self.dispatcher.resolve("tools/run.py"), "python")
+        self.assertEqual(self.dispatcher.resolve("README.md"), None)
+        self.assertEqual(self.dispatcher.resolve("h"), None)
+
+    def test_globs(self):
+        self.assertEqual(self.dispatcher.resolve("scripts/deploy"), "python")
+        self.assertEqual(self.dispatcher.resolve("SConstruct"), "python")
+        self.assertEqual(self.dispatcher.resolve("src/SConstruct"), None)
+
+    def test_exclude(self):
+        self.assertEqual(self.dispatcher.resolve("vendor/lib/a.cpp"), None)
+        self.assertEqual(self.dispatcher.resolve("third_party/a.cpp"), None)
+        self.assertEqual(self.dispatcher.resolve("src/message.pb.h"), None)
+        self.assertEqual(self.dispatcher.resolve("src/vendor/a.cpp"), "c-like")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+from styler_backends import create, load_python_styler
+import diff_util
+import concurrent.futures
+import re
+import tempfile
+import unittest
+
+
+def collapse_spaces(source, path):
+    """Python styler used in tests."""
+    return re.sub(" +", " ", source)
+
+
+class TestStylerBackends(unittest.TestCase):
+    def test_subprocess(self):
+        backend = create({"styler_command": ["sed", "-e", "s/  */ /g"]})
+        with tempfile.NamedTemporaryFile("w", suffix=".cpp") as source_file:
+            source_file.write("int  a;\n")
+            source_file.flush()
+            self.assertEqual(backend.style(source_file.name, b"int  a;\n"), b"int a;\n")
+            self.assertEqual(backend.style(source_file.name, b"int  a;\n", ["-e", "s/a/b/"]), b"int b;\n")
+        self.assertEqual(backend.identity()[:3], ["sed", "-e", "s/  */ /g"])
+        self.assertFalse(backend.reads_content)
+
+    def test_subprocess_limits(self):
+        backend = create({"styler_command": ["sh", "-c", "sleep 10", "-"], "timeout": 0.2})
+        self.assertRaises(diff_util.LimitExceeded, backend.style, "a.cpp", b"")
+
+    def test_subprocess_stdin(self):
+        backend = create({"styler_command": ["sed", "-e", "s/  */ /g"], "stdin_argument": "-e s|{path}||"})
+        self.assertTrue(backend.reads_content)
+        self.assertEqual(backend.style("not/in/working/tree.cpp", b"int  a; // not/in/working/tree.cpp\n"), b"int a; // \n")
+
+    def test_python(self):
+        backend = create({"backend": "python", "python_styler": "test_styler_backends:collapse_spaces"})
+        self.assertEqual(backend.style("a.py", b"a  = 1\n"), b"a = 1\n")
+        self.assertEqual(backend.identity(), ["python", "test_styler_backends:collapse_spaces", ""])
+
+    def test_worker(self):
+        backend = create({"backend": "worker", "python_styler": "test_styler_backends:collapse_spaces"}, jobs=2)
+        try:
+            self.assertEqual(backend.style("a.py", b"a  = 1\n"), b"a = 1\n")
+            self.assertEqual(backend.style("b.py", b"b  = 2\n"), b"b = 2\n")
+        finally:
+            backend.close()
+
+    def test_worker_started_from_threads(self):
+        # workers are started on demand by the threads that check files
+        backend = create({"backend": "worker", "python_styler": "test_styler_backends:collapse_spaces"}, jobs=2)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                styled = list(executor.map(lambda i: backend.style("a.py", "a{}  = 1\n".format(i).encode()), range(8)))
+            self.assertEqual(styled, [ "a{} = 1\n".format(i).encode() for i in range(8) ])
+        finally:
+            backend.close()
+
+    def test_unknown_styler(self):
+        self.assertRaises(RuntimeError, load_python_styler, "unknown")
+        self.assertRaises(RuntimeError, load_python_styler, "no_such_module_here:style")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from suggestion_ledger import SuggestionLedger
+import os
+import tempfile
+import unittest
+
+
+class TestSuggestionLedger(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "ledger.json")
+        self.style = {"suffixes": [".cpp"], "styler_command": ["clang-format"]}
+        self.diff = ["--- a/a.cpp", "+++ b/a.cpp", "@@ -1 +1 @@", "-int a;", "+int  a;"]
+        self.identity = ["clang-format", "clang-format version 14.0.0"]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_suggestions(self):
+        ledger = SuggestionLedger(self.path)
+        self.assertIsNone(ledger.get("a.cpp", b"int  a;\n", self.style, self.diff, self.identity))
+        ledger.put("a.cpp", b"int  a;\n", self.style, self.diff, self.identity, [(1, "int a;")])
+        ledger.save()
+
+        ledger = SuggestionLedger(self.path)
+        self.assertEqual(ledger.get("a.cpp", b"int  a;\n", self.style, self.diff, self.identity), [(1, "int a;")])
+        self.assertIsNone(ledger.get("b.cpp", b"int  a;\n", self.style, self.diff, self.identity))
+        self.assertIsNone(ledger.get("a.cpp", b"int   a;\n", self.style, self.diff, self.identity))
+        self.assertIsNone(ledger.get("a.cpp", b"int  a;\n", {"suffixes": [".cpp"], "styler_command": ["clang-format", "-style=LLVM"]},
+                                     self.diff, self.identity))
+        self.assertIsNone(ledger.get("a.cpp", b"int  a;\n", self.style, self.diff[:3] + ["+int  a;"], self.identity))
+        self.assertIsNone(ledger.get("a.cpp", b"int  a;\n", self.style, self.diff, ["clang-format", "clang-format version 15.0.0"]))
+
+    def test_reported(self):
+        comment = {"path": "a.cpp", "position": 1, "body": "int a;"}
+        ledger = SuggestionLedger(self.path)
+        self.assertFalse(ledger.is_reported("pull/7", comment))
+        ledger.mark_reported("pull/7", [comment])
+        ledger.save()
+
+        ledger = SuggestionLedger(self.path)
+        self.assertTrue(ledger.is_reported("pull/7", comment))
+        self.assertFalse(ledger.is_reported("pull/8", comment))
+        self.assertFalse(ledger.is_reported("commit/abc123", comment))
+        self.assertFalse(ledger.is_reported("pull/7", {"path": "a.cpp", "position": 1, "body": "int b;"}))
+        self.assertFalse(ledger.is_reported("pull/7", {"path": "a.cpp", "position": 2, "body": "int a;"}))
+
+    def test_max_entries(self):
+        ledger = SuggestionLedger(self.path, max_entries=2)
+        for i in range(3):
+            ledger.put("a.cpp", str(i).encode(), self.style, self.diff, self.identity, [])
+            ledger.files[ledger.key("a.cpp", str(i).encode(), self.style, self.diff, self.identity)]["used"] = i
+            comment = {"path": "a.cpp", "position": i, "body": "int a;"}
+            ledger.mark_reported("pull/7", [comment])
+            ledger.reported[ledger.comment_key("pull/7", comment)] = i
+        ledger.save()
+
+        ledger = SuggestionLedger(self.path)
+        self.assertIsNone(ledger.get("a.cpp", b"0", self.style, self.diff, self.identity))
+        self.assertEqual(ledger.get("a.cpp", b"2", self.style, self.diff, self.identity), [])
+        self.assertEqual(len(ledger.reported), 2)
+        self.assertFalse(ledger.is_reported("pull/7", {"path": "a.cpp", "position": 0, "body": "int a;"}))
+        self.assertTrue(ledger.is_reported("pull/7", {"path": "a.cpp", "position": 2, "body": "int a;"}))
+
+
+if __name__ == "__main__":
+    unittest.main()